@@ -0,0 +1,70 @@
+"""Задержка страницы категории: глобальная лента против выборки по category_id.
+
+    python benchmarks/category_feed.py --posts 1000000 --categories 10000
+
+Задержка меряется на случайной выборке категорий: через ORM, через HTTP и
+после удаления индекса ``post_category_feed_idx``.
+"""
+import random
+
+from common import make_parser, measure, report, seed, setup_django
+
+
+def main():
+    parser = make_parser(__doc__, posts=1_000_000)
+    parser.set_defaults(categories=10_000)
+    parser.add_argument('--sample', type=int, default=50)
+    args = parser.parse_args()
+    setup_django(args.db, FEED_CACHE_TIMEOUT=0)
+    seed(args.posts, args.categories, args.authors)
+
+    from django.core.paginator import Paginator
+    from django.db import connection
+    from django.test import Client
+
+    from blog.cache import get_category
+    from blog.models import Category, Post
+
+    slugs = list(
+        Category.objects.filter(is_published=True)
+        .values_list('slug', flat=True)
+    )
+    sample = random.Random(0).sample(slugs, min(args.sample, len(slugs)))
+
+    def global_feed(slug):
+        category = Category.objects.get(slug=slug)
+        page = Paginator(Post.feed(), 10).page(1)
+        return category, list(page)
+
+    def category_feed(slug):
+        category = get_category(slug)
+        page = Paginator(Post.feed().filter(category=category), 10).page(1)
+        return category, list(page)
+
+    def sample_latency(func):
+        timings = [measure(lambda: func(slug), 3)[0] for slug in sample]
+        timings.sort()
+        return (f'{timings[len(timings) // 2]:8.2f} мс (медиана)',
+                f'{timings[int(len(timings) * 0.95)]:8.2f} мс (p95)')
+
+    report(f'ORM, {len(sample)} категорий из {args.categories}', [
+        ('глобальная лента', *sample_latency(global_feed)),
+        ('лента категории', *sample_latency(category_feed)),
+    ])
+
+    client = Client()
+    report('HTTP GET /category/<slug>/', [
+        ('лента категории', *sample_latency(
+            lambda slug: client.get(f'/category/{slug}/')
+        )),
+    ])
+
+    with connection.cursor() as cursor:
+        cursor.execute('DROP INDEX post_category_feed_idx')
+    report('без индекса post_category_feed_idx', [
+        ('лента категории', *sample_latency(category_feed)),
+    ])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,147 @@
+"""Общие утилиты бенчмарков: отдельная SQLite-база и генерация данных.
+
+Бенчмарки запускаются из корня репозитория, например::
+
+    python benchmarks/feed_indexes.py --posts 1000000
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT_DIR / 'blogicum'))
+
+BATCH_SIZE = 50_000
+
+
+def make_parser(description, posts=100_000):
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument('--posts', type=int, default=posts)
+    parser.add_argument('--categories', type=int, default=100)
+    parser.add_argument('--authors', type=int, default=1000)
+    parser.add_argument('--comments-per-post', type=float, default=0.0)
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument(
+        '--db', default=None,
+        help='Путь к файлу SQLite; по умолчанию временный файл.'
+    )
+    return parser
+
+
+def setup_django(db_path=None, **overrides):
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'blogicum.settings')
+    import django
+    from django.conf import settings
+
+    if db_path is None:
+        db_path = Path(tempfile.mkdtemp(prefix='blogicum-bench-')) / 'db'
+    settings.DATABASES['default']['NAME'] = str(db_path)
+    settings.ALLOWED_HOSTS = ['*']
+    for name, value in overrides.items():
+        setattr(settings, name, value)
+    django.setup()
+
+    from django.core.management import call_command
+    call_command('migrate', verbosity=0)
+    return db_path
+
+
+def as_db(value):
+    return value.strftime('%Y-%m-%d %H:%M:%S.%f')
+
+
+def seed(posts, categories=100, authors=1000, comments_per_post=0.0,
+         seed_value=0):
+    """Быстро заполняет базу «сырыми» INSERT-ами пачками по BATCH_SIZE."""
+    from django.db import connection, transaction
+
+    rnd = random.Random(seed_value)
+    current = datetime.now(timezone.utc).replace(tzinfo=None)
+    now = as_db(current)
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.executemany(
+            'INSERT INTO auth_user (password, is_superuser, username,'
+            ' first_name, last_name, email, is_staff, is_active,'
+            ' date_joined) VALUES (%s, 0, %s, %s, %s, %s, 0, 1, %s)',
+            [('!', f'author{i}', '', '', '', now)
+             for i in range(authors)]
+        )
+        cursor.executemany(
+            'INSERT INTO blog_category (title, description, slug,'
+            ' is_published, created_at, updated_at)'
+            ' VALUES (%s, %s, %s, %s, %s, %s)',
+            [(f'Категория {i}', '', f'category-{i}', i % 10 != 0, now, now)
+             for i in range(categories)]
+        )
+        cursor.executemany(
+            'INSERT INTO blog_location (name, is_published, created_at,'
+            ' updated_at) VALUES (%s, %s, %s, %s)',
+            [(f'Место {i}', True, now, now) for i in range(50)]
+        )
+        cursor.execute('SELECT MIN(id) FROM auth_user')
+        first_author = cursor.fetchone()[0]
+        cursor.execute('SELECT MIN(id) FROM blog_category')
+        first_category = cursor.fetchone()[0]
+        cursor.execute('SELECT MIN(id) FROM blog_location')
+        first_location = cursor.fetchone()[0]
+
+        for start in range(0, posts, BATCH_SIZE):
+            rows = []
+            for i in range(start, min(start + BATCH_SIZE, posts)):
+                pub_date = as_db(current - timedelta(
+                    minutes=rnd.randrange(-60 * 24 * 30, 60 * 24 * 3650)
+                ))
+                rows.append((
+                    f'Публикация {i}', 'Текст публикации ' * 20, pub_date,
+                    first_author + rnd.randrange(authors),
+                    first_location + rnd.randrange(50),
+                    first_category + rnd.randrange(categories),
+                    rnd.random() > 0.05, now, now, '',
+                ))
+            cursor.executemany(
+                'INSERT INTO blog_post (title, text, pub_date, author_id,'
+                ' location_id, category_id, is_published, created_at,'
+                ' updated_at, image, image_widths, comment_count)'
+                " VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, '[]', 0)",
+                rows
+            )
+
+        n_comments = int(posts * comments_per_post)
+        cursor.execute('SELECT MIN(id) FROM blog_post')
+        first_post = cursor.fetchone()[0]
+        for start in range(0, n_comments, BATCH_SIZE):
+            cursor.executemany(
+                'INSERT INTO blog_comment (text, post_id, created_at,'
+                ' author_id) VALUES (%s, %s, %s, %s)',
+                [('Комментарий', first_post + rnd.randrange(posts), now,
+                  first_author + rnd.randrange(authors))
+                 for _ in range(start, min(start + BATCH_SIZE, n_comments))]
+            )
+    if comments_per_post:
+        from blog.models import Post
+        Post.objects.recount_comments()
+    with connection.cursor() as cursor:
+        cursor.execute('ANALYZE')
+
+
+def measure(func, repeat):
+    """Возвращает (медиана, минимум) времени вызова в миллисекундах."""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings), min(timings)
+
+
+def report(title, rows):
+    print(f'\n== {title}')
+    width = max(len(name) for name, *_ in rows)
+    for name, *values in rows:
+        print(f'  {name:<{width}}  ' + '  '.join(values))
@@ -0,0 +1,134 @@
+"""Цена открытия соединения с БД на запрос: CONN_MAX_AGE=0 против reuse.
+
+    python benchmarks/db_connections.py --posts 10000 --requests 2000
+
+Запросы проходят через настоящие WSGIHandler и ASGIHandler (с
+асинхронными представлениями), поэтому срабатывают request_started и
+request_finished, которые закрывают или сохраняют соединения. Для каждого
+режима выводятся задержка страницы публикации и счётчики соединений.
+"""
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import subprocess
+import sys
+import time
+
+from common import make_parser, report, seed, setup_django
+
+SERVERS = ('WSGI', 'ASGI')
+
+
+def wsgi_get(handler, environ_for, path):
+    response = handler(environ_for(path), lambda status, headers: None)
+    response.close()
+    return response.status_code
+
+
+def asgi_get(handler, path):
+    scope = {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1',
+        'method': 'GET', 'scheme': 'http', 'path': path, 'query_string': b'',
+        'headers': [(b'host', b'localhost')],
+        'server': ('localhost', 80), 'client': ('127.0.0.1', 0),
+    }
+    messages = []
+
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message):
+        messages.append(message)
+
+    async def run():
+        await handler(scope, receive, send)
+
+    asyncio.run(run())
+    return messages[0]['status']
+
+
+def measure_requests(server, max_age, requests):
+    from django.core.asgi import get_asgi_application
+    from django.core.wsgi import get_wsgi_application
+    from django.db import connections
+    from django.test import RequestFactory
+
+    from blog.connections import get_connection_stats, reset_connection_stats
+    from blog.models import Post
+
+    connections.databases['default']['CONN_MAX_AGE'] = max_age
+    post_ids = list(
+        Post.objects.published().values_list('pk', flat=True)[:500]
+    )
+    connections.close_all()
+    rnd = random.Random(0)
+    paths = [f'/posts/{rnd.choice(post_ids)}/' for _ in range(requests)]
+
+    if server == 'WSGI':
+        handler = get_wsgi_application()
+        factory = RequestFactory(HTTP_HOST='localhost')
+
+        def get(path):
+            return wsgi_get(handler, lambda p: factory.get(p).environ, path)
+    else:
+        handler = get_asgi_application()
+
+        def get(path):
+            return asgi_get(handler, path)
+
+    reset_connection_stats()
+    timings = []
+    for path in paths:
+        started = time.perf_counter()
+        assert get(path) == 200
+        timings.append((time.perf_counter() - started) * 1000)
+    counts = get_connection_stats()['databases']['default']
+    return statistics.median(timings), counts
+
+
+def main():
+    parser = make_parser(__doc__, posts=10_000)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--server', choices=SERVERS, help=argparse.SUPPRESS)
+    parser.add_argument('--max-age', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.server:
+        # Каждый режим — отдельный процесс: соединения потоков пула
+        # асинхронных представлений не переходят из одного замера в другой.
+        setup_django(
+            args.db, FEED_CACHE_TIMEOUT=0, ASYNC_VIEWS=args.server == 'ASGI'
+        )
+        median, counts = measure_requests(
+            args.server, args.max_age, args.requests
+        )
+        print(json.dumps({'median': median, **counts}))
+        return
+
+    db_path = setup_django(args.db)
+    seed(args.posts, args.categories, args.authors)
+
+    rows = []
+    for server in SERVERS:
+        for max_age in (0, 60):
+            output = subprocess.run(
+                [sys.executable, __file__, '--db', str(db_path),
+                 '--server', server, '--max-age', str(max_age),
+                 '--requests', str(args.requests)],
+                check=True, capture_output=True, text=True
+            ).stdout
+            result = json.loads(output.splitlines()[-1])
+            rows.append((
+                f'{server}, CONN_MAX_AGE={max_age}',
+                f'{result["median"]:7.2f} мс (медиана)',
+                f'открыто {result["opened"]:5}',
+                f'повторно {result["reused"]:5}',
+            ))
+
+    report(f'GET /posts/<id>/, {args.requests} запросов', rows)
+
+
+if __name__ == '__main__':
+    main()
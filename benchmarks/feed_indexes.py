@@ -0,0 +1,67 @@
+"""Планы запросов ленты до и после составных индексов (миграция 0009).
+
+    python benchmarks/feed_indexes.py --posts 1000000 --comments-per-post 1
+
+Индексы снимаются и создаются заново на той же базе; для каждого запроса
+выводятся время и план ``EXPLAIN``.
+"""
+from common import make_parser, measure, report, seed, setup_django
+
+
+def feed_queries():
+    from blog.models import Category, Comment, Post
+
+    category = Category.objects.filter(is_published=True).first()
+    author_id = Post.objects.values_list('author_id', flat=True).first()
+    post_id = Post.objects.values_list('pk', flat=True).last()
+    return {
+        'лента': Post.feed(),
+        'категория': Post.feed().filter(category=category),
+        'профиль (автор)': Post.feed(is_for_author=True).filter(
+            author_id=author_id
+        ),
+        'комментарии': Comment.objects.filter(
+            post_id=post_id
+        ).select_related('author'),
+    }
+
+
+def run(queries, repeat, label):
+    rows = []
+    for name, queryset in queries.items():
+        page = queryset[:10]
+        median, best = measure(lambda: list(page.all()), repeat)
+        rows.append((name, f'{median:8.2f} мс (медиана)',
+                     f'{best:8.2f} мс (мин.)'))
+        print(f'\n-- {label}: {name}\n{page.explain()}')
+    report(label, rows)
+
+
+def main():
+    args = make_parser(__doc__, posts=1_000_000).parse_args()
+    setup_django(args.db)
+    seed(args.posts, args.categories, args.authors, args.comments_per_post)
+
+    from django.db import connection
+    from blog.models import Comment, Post
+
+    indexes = [
+        (model, index)
+        for model in (Post, Comment)
+        for index in model._meta.indexes
+    ]
+    with connection.schema_editor() as editor:
+        for model, index in indexes:
+            editor.remove_index(model, index)
+    run(feed_queries(), args.repeat, 'без индексов')
+
+    with connection.schema_editor() as editor:
+        for model, index in indexes:
+            editor.add_index(model, index)
+    with connection.cursor() as cursor:
+        cursor.execute('ANALYZE')
+    run(feed_queries(), args.repeat, 'с индексами')
+
+
+if __name__ == '__main__':
+    main()
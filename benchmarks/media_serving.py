@@ -0,0 +1,202 @@
+"""Пропускная способность раздачи больших фото публикаций.
+
+    python benchmarks/media_serving.py --size-mb 20 --concurrency 8
+
+Сравниваются отладочный ``django.views.static.serve``, отдача файла
+через ``blogicum.media.serve_media`` с копированием в процессе
+(``wsgiref`` читает файл блоками) и с ``os.sendfile`` — так его отдают
+gunicorn и uWSGI через ``wsgi.file_wrapper``, здесь это делает
+``SendfileServerHandler``. Отдельно — запросы ``Range`` по 1 МиБ и
+режим X-Accel-Redirect, где тело отдаёт nginx, а Django только отвечает
+заголовками. Каждый режим — отдельный процесс сервера.
+"""
+import argparse
+import http.client
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from common import make_parser, report, setup_django
+
+MODES = (
+    'debug-serve', 'copy', 'sendfile', 'sendfile-range', 'x-accel-redirect',
+)
+RANGE_SIZE = 1024 * 1024
+IMAGE = 'posts_images/large.jpg'
+
+
+def sendfile_handler():
+    from django.core.servers import basehttp
+
+    class SendfileServerHandler(basehttp.ServerHandler):
+        def sendfile(self):
+            filelike = getattr(self.result, 'filelike', None)
+            if filelike is None or not hasattr(filelike, 'fileno'):
+                return False
+            if not self.headers_sent:
+                self.send_headers()
+            self._flush()
+            socket = self.request_handler.connection
+            offset = filelike.tell()
+            remaining = int(self.headers['Content-Length'])
+            while remaining:
+                sent = os.sendfile(
+                    socket.fileno(), filelike.fileno(), offset, remaining
+                )
+                if not sent:
+                    break
+                offset += sent
+                remaining -= sent
+            return True
+
+    return SendfileServerHandler
+
+
+def serve(mode, port):
+    from django.conf import settings
+    from django.core.servers import basehttp
+    from django.core.wsgi import get_wsgi_application
+    from django.urls import re_path
+    from django.views.static import serve as debug_serve
+
+    from blogicum.media import media_urlpatterns
+
+    # Собственный urlconf: отладочную раздачу Django подключает только
+    # при DEBUG, а здесь она нужна для сравнения.
+    urlconf = type(sys)('bench_urls')
+    urlconf.urlpatterns = [
+        re_path(r'^debug/(?P<path>.+)$', debug_serve,
+                {'document_root': settings.MEDIA_ROOT}),
+        *media_urlpatterns(),
+    ]
+    sys.modules['bench_urls'] = urlconf
+    settings.ROOT_URLCONF = 'bench_urls'
+    if mode.startswith('sendfile'):
+        basehttp.ServerHandler = sendfile_handler()
+    basehttp.run('127.0.0.1', port, get_wsgi_application(), threading=True)
+
+
+def wait_for_port(port, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            connection = http.client.HTTPConnection(
+                '127.0.0.1', port, timeout=0.5
+            )
+            connection.connect()
+            connection.close()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f'Сервер на порту {port} не запустился.')
+
+
+def load(port, path, size, ranged, concurrency, duration):
+    received, requests, errors = [0], [0], [0]
+    lock = threading.Lock()
+    deadline = time.monotonic() + duration
+
+    def client(seed_value):
+        rnd = random.Random(seed_value)
+        while time.monotonic() < deadline:
+            headers = {}
+            if ranged:
+                start = rnd.randrange(size - RANGE_SIZE)
+                headers['Range'] = f'bytes={start}-{start + RANGE_SIZE - 1}'
+            connection = http.client.HTTPConnection('127.0.0.1', port)
+            try:
+                connection.request('GET', path, headers=headers)
+                response = connection.getresponse()
+                body = response.read()
+                ok = response.status in (200, 206)
+            except OSError:
+                body, ok = b'', False
+            finally:
+                connection.close()
+            with lock:
+                requests[0] += 1
+                received[0] += len(body)
+                errors[0] += not ok
+
+    threads = [
+        threading.Thread(target=client, args=(i,))
+        for i in range(concurrency)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return received[0], requests[0], errors[0]
+
+
+def main():
+    parser = make_parser(__doc__)
+    parser.add_argument('--size-mb', type=int, default=20)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--duration', type=float, default=5)
+    parser.add_argument('--port', type=int, default=8766)
+    parser.add_argument('--media-root', help=argparse.SUPPRESS)
+    parser.add_argument('--serve', choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        setup_django(
+            args.db, MEDIA_ROOT=args.media_root,
+            MEDIA_SERVING=(
+                'x-accel-redirect' if args.serve == 'x-accel-redirect'
+                else 'django'
+            )
+        )
+        serve(args.serve, args.port)
+        return
+
+    db_path = setup_django(args.db)
+    media_root = Path(args.media_root or tempfile.mkdtemp(
+        prefix='blogicum-media-'
+    ))
+    image = media_root / IMAGE
+    image.parent.mkdir(parents=True, exist_ok=True)
+    size = args.size_mb * 1024 * 1024
+    image.write_bytes(os.urandom(size))
+
+    rows = []
+    for mode in MODES:
+        path = f'/debug/{IMAGE}' if mode == 'debug-serve' else (
+            f'/media/{IMAGE}'
+        )
+        server = subprocess.Popen(
+            [sys.executable, __file__, '--serve', mode,
+             '--db', str(db_path), '--port', str(args.port),
+             '--media-root', str(media_root)],
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        try:
+            wait_for_port(args.port)
+            received, requests, errors = load(
+                args.port, path, size, mode == 'sendfile-range',
+                args.concurrency, args.duration
+            )
+        finally:
+            server.terminate()
+            server.wait()
+        rows.append((
+            mode,
+            f'{received / args.duration / 2 ** 20:9.1f} МиБ/с',
+            f'{requests / args.duration:8.1f} запр/с',
+            f'ошибок: {errors}',
+        ))
+
+    report(
+        f'Файл {args.size_mb} МиБ, {args.concurrency} клиентов,'
+        f' {args.duration:g} с',
+        rows
+    )
+
+
+if __name__ == '__main__':
+    main()
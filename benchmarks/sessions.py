@@ -0,0 +1,165 @@
+"""Цена сессий на запрос: db против cached_db и анонимы без хранилища.
+
+    python benchmarks/sessions.py --posts 10000 --users 200 --requests 2000
+
+Авторизованные пользователи ходят по смеси страниц TRAFFIC_MIX; для
+каждого движка сессий выводятся медиана запроса и число обращений к
+``django_session`` на запрос (чтений и записей). Затем аноним с непустой
+сессией открывает ленту с SESSION_SKIP_ANONYMOUS и без него.
+
+Каждый режим работает со своим клиентом: ``Client`` загружает
+middleware, а с ними и движок сессий, при первом запросе.
+"""
+import random
+import statistics
+import time
+from collections import Counter
+
+from common import make_parser, report, seed, setup_django
+
+ENGINES = (
+    'django.contrib.sessions.backends.db',
+    'django.contrib.sessions.backends.cached_db',
+)
+# Страница и её вес в смеси запросов авторизованных пользователей.
+TRAFFIC_MIX = (
+    ('index', 4),
+    ('post_detail', 4),
+    ('category_posts', 1),
+    ('profile', 1),
+)
+
+
+class SessionQueries:
+    """Считает чтения и записи таблицы сессий через execute_wrapper."""
+
+    def __init__(self):
+        self.counts = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        if 'django_session' in sql:
+            kind = 'reads' if sql.lstrip().startswith('SELECT') else 'writes'
+            self.counts[kind] += 1
+        return execute(sql, params, many, context)
+
+
+def make_paths(requests):
+    from django.urls import reverse
+
+    from blog.models import Category, Post
+
+    rnd = random.Random(0)
+    posts = list(Post.objects.published().select_related('author')[:500])
+    slugs = list(
+        Category.objects.filter(is_published=True).values_list(
+            'slug', flat=True
+        )
+    )
+    names = [name for name, weight in TRAFFIC_MIX for _ in range(weight)]
+    paths = []
+    for _ in range(requests):
+        name = rnd.choice(names)
+        post = rnd.choice(posts)
+        kwargs = {
+            'index': {},
+            'post_detail': {'post_id': post.pk},
+            'category_posts': {'category_slug': rnd.choice(slugs)},
+            'profile': {'username': post.author.username},
+        }[name]
+        paths.append(reverse(f'blog:{name}', kwargs=kwargs))
+    return paths
+
+
+def run(clients, paths):
+    from django.db import connection
+
+    counter = SessionQueries()
+    timings = []
+    with connection.execute_wrapper(counter):
+        for i, path in enumerate(paths):
+            client = clients[i % len(clients)]
+            started = time.perf_counter()
+            assert client.get(path).status_code == 200
+            timings.append((time.perf_counter() - started) * 1000)
+    per_request = {
+        kind: counter.counts[kind] / len(paths)
+        for kind in ('reads', 'writes')
+    }
+    return statistics.median(timings), per_request
+
+
+def authenticated_clients(users):
+    from django.contrib.auth import get_user_model
+    from django.test import Client
+
+    clients = []
+    for user in get_user_model().objects.order_by('pk')[:users]:
+        client = Client()
+        client.force_login(user)
+        clients.append(client)
+    return clients
+
+
+def anonymous_client():
+    from django.conf import settings
+    from django.test import Client
+
+    client = Client()
+    session = client.session
+    session['seen_rules'] = True
+    session.save()
+    client.cookies[settings.SESSION_COOKIE_NAME] = session.session_key
+    return client
+
+
+def main():
+    parser = make_parser(__doc__, posts=10_000)
+    parser.add_argument('--users', type=int, default=200)
+    parser.add_argument('--requests', type=int, default=2000)
+    args = parser.parse_args()
+
+    setup_django(args.db, FEED_CACHE_TIMEOUT=0)
+    seed(args.posts, args.categories, args.authors)
+
+    from django.conf import settings
+    from django.core.cache import caches
+
+    paths = make_paths(args.requests)
+    rows = []
+    for engine in ENGINES:
+        settings.SESSION_ENGINE = engine
+        caches[settings.SESSION_CACHE_ALIAS].clear()
+        clients = authenticated_clients(args.users)
+        median, per_request = run(clients, paths)
+        rows.append((
+            engine.rsplit('.', 1)[-1],
+            f'{median:7.2f} мс (медиана)',
+            f'чтений {per_request["reads"]:.2f}',
+            f'записей {per_request["writes"]:.2f}',
+        ))
+    report(
+        f'Авторизованные, {args.users} пользователей,'
+        f' {args.requests} запросов',
+        rows
+    )
+
+    rows = []
+    feed = ['/'] * args.requests
+    for engine in ENGINES:
+        settings.SESSION_ENGINE = engine
+        for skip in (False, True):
+            settings.SESSION_SKIP_ANONYMOUS = skip
+            client = anonymous_client()
+            client.get('/')
+            median, per_request = run([client], feed)
+            rows.append((
+                f'{engine.rsplit(".", 1)[-1]},'
+                f' SESSION_SKIP_ANONYMOUS={skip}',
+                f'{median:7.2f} мс (медиана)',
+                f'чтений {per_request["reads"]:.2f}',
+            ))
+    report(f'Аноним с сессией, GET /, {args.requests} запросов', rows)
+
+
+if __name__ == '__main__':
+    main()
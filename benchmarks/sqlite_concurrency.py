@@ -0,0 +1,143 @@
+"""Одновременная запись комментариев и чтение ленты на SQLite.
+
+    python benchmarks/sqlite_concurrency.py --writers 16 --readers 16
+
+Сравниваются настройки соединения Django по умолчанию (журнал отката) и
+профиль SQLITE_PRAGMAS из settings.py (WAL, synchronous=NORMAL, mmap,
+кэш страниц). Писатели создают комментарии так же, как CommentCreateView,
+читатели листают ленту; считаются пропускная способность и ошибки
+«database is locked». Транзакции в обоих режимах начинаются с
+``BEGIN IMMEDIATE`` (``blogicum.backends.sqlite3``).
+"""
+import random
+import threading
+import time
+
+from common import make_parser, report, seed, setup_django
+
+DEFAULT_PRAGMAS = {'journal_mode': 'DELETE'}
+
+
+class Stress:
+    def __init__(self, duration):
+        self.deadline = time.monotonic() + duration
+        self.timings = {'write': [], 'read': []}
+        self.locked = 0
+        self.lock = threading.Lock()
+        self.threads = []
+
+    def start(self, kind, action, count):
+        for i in range(count):
+            thread = threading.Thread(
+                target=self.loop, args=(kind, action, random.Random(i))
+            )
+            thread.start()
+            self.threads.append(thread)
+
+    def loop(self, kind, action, rnd):
+        from django.db import OperationalError, connection
+
+        try:
+            while time.monotonic() < self.deadline:
+                started = time.perf_counter()
+                try:
+                    action(rnd)
+                except OperationalError as error:
+                    if 'locked' not in str(error):
+                        raise
+                    with self.lock:
+                        self.locked += 1
+                    continue
+                with self.lock:
+                    self.timings[kind].append(
+                        (time.perf_counter() - started) * 1000
+                    )
+        finally:
+            connection.close()
+
+    def join(self):
+        for thread in self.threads:
+            thread.join()
+
+
+def stress(writers, readers, duration, posts, authors):
+    from django.core.paginator import Paginator
+    from django.db import transaction
+
+    from blog.models import Comment, Post
+
+    def write(rnd):
+        with transaction.atomic():
+            Comment.objects.create(
+                text='Комментарий',
+                post_id=rnd.choice(posts),
+                author_id=rnd.choice(authors),
+            )
+
+    def read(rnd):
+        list(Paginator(Post.feed(), 10).page(rnd.randint(1, 50)))
+
+    run = Stress(duration)
+    run.start('write', write, writers)
+    run.start('read', read, readers)
+    run.join()
+    return run.timings['write'], run.timings['read'], run.locked
+
+
+def p95(timings):
+    if not timings:
+        return '       — мс (p95)'
+    timings = sorted(timings)
+    return f'{timings[int(len(timings) * 0.95)]:8.1f} мс (p95)'
+
+
+def main():
+    parser = make_parser(__doc__, posts=50_000)
+    parser.add_argument('--writers', type=int, default=16)
+    parser.add_argument('--readers', type=int, default=16)
+    parser.add_argument('--duration', type=float, default=10)
+    args = parser.parse_args()
+    setup_django(args.db, FEED_CACHE_TIMEOUT=0)
+
+    from django.conf import settings
+    from django.db import connections
+
+    tuned = dict(settings.SQLITE_PRAGMAS)
+    settings.SQLITE_PRAGMAS = DEFAULT_PRAGMAS
+    connections.close_all()
+    seed(args.posts, args.categories, args.authors)
+
+    from django.contrib.auth import get_user_model
+
+    from blog.models import Post
+
+    posts = list(Post.objects.values_list('pk', flat=True)[:1000])
+    authors = list(
+        get_user_model().objects.values_list('pk', flat=True)[:1000]
+    )
+
+    rows = []
+    for name, pragmas in (('по умолчанию', DEFAULT_PRAGMAS),
+                          ('SQLITE_PRAGMAS', tuned)):
+        settings.SQLITE_PRAGMAS = pragmas
+        connections.close_all()
+        writes, reads, locked = stress(
+            args.writers, args.readers, args.duration, posts, authors
+        )
+        connections.close_all()
+        rows.append((
+            name,
+            f'запись {len(writes) / args.duration:7.1f}/с', p95(writes),
+            f'чтение {len(reads) / args.duration:7.1f}/с', p95(reads),
+            f'database is locked: {locked}',
+        ))
+
+    report(
+        f'{args.writers} писателей, {args.readers} читателей,'
+        f' {args.duration:g} с',
+        rows
+    )
+
+
+if __name__ == '__main__':
+    main()
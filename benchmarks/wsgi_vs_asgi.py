@@ -0,0 +1,161 @@
+"""Пропускная способность ленты и страницы публикации: WSGI против ASGI.
+
+    python benchmarks/wsgi_vs_asgi.py --posts 100000 --concurrency 200
+
+Каждый сервер запускается отдельным процессом на одной и той же базе:
+многопоточный WSGI-сервер Django, uvicorn с синхронными представлениями
+и uvicorn с асинхронными (ASYNC_VIEWS). Нагрузку создают
+``--concurrency`` одновременных клиентов в течение ``--duration`` секунд.
+Для ASGI нужен uvicorn.
+"""
+import argparse
+import asyncio
+import importlib.util
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+from common import make_parser, report, seed, setup_django
+
+SERVERS = ('wsgi', 'asgi', 'asgi-async')
+
+
+def serve(mode, port):
+    if mode == 'wsgi':
+        from django.core.servers.basehttp import run
+        from django.core.wsgi import get_wsgi_application
+
+        run('127.0.0.1', port, get_wsgi_application(), threading=True)
+    else:
+        import uvicorn
+        from django.core.asgi import get_asgi_application
+
+        uvicorn.run(
+            get_asgi_application(), host='127.0.0.1', port=port,
+            log_level='warning', lifespan='off'
+        )
+
+
+def wait_for_port(port, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(('127.0.0.1', port), 0.5).close()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f'Сервер на порту {port} не запустился.')
+
+
+async def fetch(port, path):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    writer.write(
+        f'GET {path} HTTP/1.1\r\nHost: localhost\r\n'
+        'Connection: close\r\n\r\n'.encode()
+    )
+    await writer.drain()
+    status_line = await reader.readline()
+    await reader.read()
+    writer.close()
+    return int(status_line.split()[1])
+
+
+async def load(port, paths, concurrency, duration):
+    timings, errors = [], 0
+    deadline = time.monotonic() + duration
+    rnd = random.Random(0)
+
+    async def client():
+        nonlocal errors
+        while time.monotonic() < deadline:
+            started = time.perf_counter()
+            try:
+                status = await fetch(port, rnd.choice(paths))
+            except OSError:
+                status = None
+            if status == 200:
+                timings.append((time.perf_counter() - started) * 1000)
+            else:
+                errors += 1
+
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    return timings, errors
+
+
+def main():
+    parser = make_parser(__doc__)
+    parser.add_argument('--concurrency', type=int, default=200)
+    parser.add_argument('--duration', type=float, default=10)
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--serve', choices=SERVERS, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        setup_django(
+            args.db, FEED_CACHE_TIMEOUT=0,
+            ASYNC_VIEWS=args.serve == 'asgi-async'
+        )
+        serve(args.serve, args.port)
+        return
+
+    db_path = setup_django(args.db)
+    seed(args.posts, args.categories, args.authors, args.comments_per_post)
+
+    from blog.models import Category, Post
+
+    slugs = list(
+        Category.objects.filter(is_published=True)
+        .values_list('slug', flat=True)[:50]
+    )
+    post_ids = list(
+        Post.objects.published().values_list('pk', flat=True)[:200]
+    )
+    paths = (
+        ['/', '/?page=2']
+        + [f'/category/{slug}/' for slug in slugs]
+        + [f'/posts/{pk}/' for pk in post_ids]
+    )
+
+    modes = SERVERS
+    if importlib.util.find_spec('uvicorn') is None:
+        print('uvicorn не установлен: измеряется только WSGI.')
+        modes = ('wsgi',)
+
+    rows = []
+    for mode in modes:
+        server = subprocess.Popen(
+            [sys.executable, __file__, '--serve', mode,
+             '--db', str(db_path), '--port', str(args.port)],
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        try:
+            wait_for_port(args.port)
+            timings, errors = asyncio.run(
+                load(args.port, paths, args.concurrency, args.duration)
+            )
+        finally:
+            server.terminate()
+            server.wait()
+        if not timings:
+            rows.append((mode, f'все запросы с ошибкой: {errors}'))
+            continue
+        timings.sort()
+        rows.append((
+            mode,
+            f'{len(timings) / args.duration:8.1f} запр/с',
+            f'{statistics.median(timings):8.1f} мс (медиана)',
+            f'{timings[int(len(timings) * 0.95)]:8.1f} мс (p95)',
+            f'ошибок: {errors}',
+        ))
+
+    report(
+        f'{args.concurrency} клиентов, {args.duration:g} с, без кэша ленты',
+        rows
+    )
+
+
+if __name__ == '__main__':
+    main()
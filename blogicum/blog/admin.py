@@ -2,6 +2,7 @@ from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 from django.contrib.auth.models import User
 from .models import Category, Location, Post
+from .search import filter_posts
 
 class CategoryAdmin(admin.ModelAdmin):
     list_display = ('title', 'is_published', 'created_at')
@@ -22,7 +23,7 @@ class LocationAdmin(admin.ModelAdmin):
 
 class PostAdmin(admin.ModelAdmin):
     list_display = ('title', 'author', 'pub_date',
-                    'is_published', 'created_at')
+                    'is_published', 'comment_count', 'created_at')
     list_filter = ('is_published', 'category', 'location')
     search_fields = ('title', 'text')
     fieldsets = (
@@ -34,6 +35,11 @@ class PostAdmin(admin.ModelAdmin):
         }),
     )
 
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term.strip():
+            return queryset, False
+        return filter_posts(queryset, search_term), False
+
 class UserAdmin(BaseUserAdmin):
     list_display = ('username', 'email', 'first_name', 'last_name', 'is_staff')
     list_filter = ('is_staff', 'is_active')
@@ -0,0 +1,72 @@
+"""Асинхронные варианты страниц ленты и публикации для запуска под ASGI.
+
+В Django 3.2 нет асинхронного ORM, поэтому синхронное представление
+вместе с рендерингом шаблона выполняется в отдельном ограниченном пуле
+потоков (``ASYNC_VIEW_THREADS``). Так запросы не выстраиваются в очередь
+к единственному потоку, в котором ``sync_to_async`` по умолчанию
+выполняет синхронный код, а число соединений с БД не превышает размер
+пула; соединения в потоках пула живут ``CONN_MAX_AGE`` секунд, как и в
+WSGI-воркерах. Подключаются в ``blog/urls.py`` при ``ASYNC_VIEWS = True``.
+
+Все middleware из ``MIDDLEWARE`` должны поддерживать асинхронный режим:
+одна синхронная middleware заставит Django выполнять всю цепочку в том
+самом единственном потоке.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import update_wrapper
+
+from asgiref.sync import SyncToAsync
+from django.conf import settings
+from django.db import close_old_connections
+
+from .connections import check_connections
+from .instrumentation import render_response
+from .views import CategoryListView, PostDetailView, PostListView
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    global _executor
+
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.ASYNC_VIEW_THREADS,
+                thread_name_prefix='async-views'
+            )
+    return _executor
+
+
+def as_async_view(view_class, **initkwargs):
+    view = view_class.as_view(**initkwargs)
+
+    def render_view(request, *args, **kwargs):
+        # Сигналы request_started/request_finished закрывают и проверяют
+        # соединения только в потоке обработчика, поэтому потоки пула
+        # делают это сами.
+        close_old_connections()
+        check_connections()
+        try:
+            response = view(request, *args, **kwargs)
+            if callable(getattr(response, 'render', None)):
+                response = render_response(response)
+            return response
+        finally:
+            close_old_connections()
+
+    async def async_view(request, *args, **kwargs):
+        run = SyncToAsync(
+            render_view, thread_sensitive=False, executor=get_executor()
+        )
+        return await run(request, *args, **kwargs)
+
+    update_wrapper(async_view, view)
+    return async_view
+
+
+post_list = as_async_view(PostListView)
+category_posts = as_async_view(CategoryListView)
+post_detail = as_async_view(PostDetailView)
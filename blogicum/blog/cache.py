@@ -0,0 +1,181 @@
+import hashlib
+import math
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils import timezone
+from django.utils.translation import get_language
+
+FEED_VERSION_KEY = 'blog:feed:version'
+# Длиннее ключ не войдёт в 250 байт, которые допускает memcached.
+MAX_SLUG_LENGTH = 64
+
+
+def get_feed_cache():
+    return caches[getattr(settings, 'FEED_CACHE_ALIAS', 'default')]
+
+
+def feed_cache_enabled():
+    return getattr(settings, 'FEED_CACHE_TIMEOUT', 0) > 0
+
+
+def get_feed_version():
+    # Версия — время последней инвалидации, а не счётчик: так она не
+    # повторится, даже если ключ версии вытеснен из кэша, и не зависит
+    # от атомарности incr() в файловом бэкенде.
+    cache = get_feed_cache()
+    version = cache.get(FEED_VERSION_KEY)
+    if version is None:
+        cache.add(FEED_VERSION_KEY, time.time_ns(), None)
+        version = cache.get(FEED_VERSION_KEY)
+    return version
+
+
+def invalidate_feed_cache():
+    get_feed_cache().set(FEED_VERSION_KEY, time.time_ns(), None)
+
+
+CATEGORY_VERSION_KEY = 'blog:category:version'
+
+
+def invalidate_category_cache():
+    get_feed_cache().set(CATEGORY_VERSION_KEY, time.time_ns(), None)
+
+
+def get_category(slug):
+    """Категория по slug из кэша; None, если такой категории нет."""
+    from .models import Category
+
+    cache = get_feed_cache()
+    version = cache.get(CATEGORY_VERSION_KEY)
+    if version is None:
+        cache.add(CATEGORY_VERSION_KEY, time.time_ns(), None)
+        version = cache.get(CATEGORY_VERSION_KEY)
+    key = f'blog:category:{version}:{slug}'
+    category = cache.get(key)
+    if category is None:
+        category = Category.objects.filter(slug=slug).first()
+        if category is not None:
+            cache.set(key, category, settings.CATEGORY_CACHE_TIMEOUT)
+    return category
+
+
+def feed_page_key(query):
+    """Часть ключа для страницы ленты; None, если её не стоит кэшировать.
+
+    В ключ не попадают произвольные строки из запроса: курсор хешируется,
+    а номер страницы принимается только в виде числа.
+    """
+    cursor = query.get('cursor')
+    if cursor:
+        return 'c' + hashlib.md5(cursor.encode()).hexdigest()
+    page = query.get('page') or '1'
+    if page == 'last':
+        return page
+    if not (page.isascii() and page.isdigit()) or len(page) > 9:
+        return None
+    return str(int(page))
+
+
+def feed_cache_key(request):
+    """Ключ страницы ленты; None, если страницу не стоит кэшировать."""
+    match = request.resolver_match
+    page = feed_page_key(request.GET)
+    if page is None:
+        return None
+    slug = match.kwargs.get('category_slug', '')
+    if len(slug) > MAX_SLUG_LENGTH:
+        slug = hashlib.md5(slug.encode()).hexdigest()
+    return (
+        f'blog:feed:{get_feed_version()}:{match.view_name}:{slug}:{page}'
+    )
+
+
+def get_feed_timeout():
+    """Время жизни страницы ленты с учётом отложенных публикаций.
+
+    Запись не должна пережить ближайшую будущую pub_date, иначе
+    запланированная публикация появится в ленте с опозданием.
+    """
+    from .models import Post
+
+    timeout = settings.FEED_CACHE_TIMEOUT
+    now = timezone.now()
+    next_pub_date = Post.objects.filter(
+        is_published=True, pub_date__gt=now
+    ).order_by('pub_date').values_list('pub_date', flat=True).first()
+    if next_pub_date is not None:
+        seconds_left = math.ceil((next_pub_date - now).total_seconds())
+        timeout = min(timeout, seconds_left)
+    return max(timeout, 1)
+
+
+def get_cached_feed_page(key):
+    return get_feed_cache().get(key)
+
+
+def cache_feed_page(key, response):
+    if response.status_code == 200:
+        get_feed_cache().set(key, response.content, get_feed_timeout())
+
+
+POST_CARD_TEMPLATE = 'includes/post_card.html'
+_fragment_stats = Counter()
+_fragment_stats_lock = threading.Lock()
+
+
+def post_card_version(post):
+    """Отпечаток всего, что выводит карточка публикации.
+
+    Берётся из уже загруженных лентой полей, поэтому не требует запросов
+    и меняется при правке публикации, имени автора, категории или места.
+    """
+    location = post.location
+    category = post.category
+    parts = (
+        post.title, post.text, post.pub_date.isoformat(), post.is_published,
+        post.image.name, post.image_widths, post.comment_count,
+        post.author.username,
+        category and (category.slug, category.title, category.is_published),
+        location and (location.name, location.is_published),
+        get_language(),
+    )
+    return hashlib.md5(repr(parts).encode()).hexdigest()
+
+
+def _count_fragment(outcome):
+    with _fragment_stats_lock:
+        _fragment_stats[outcome] += 1
+
+
+def get_fragment_cache_stats():
+    with _fragment_stats_lock:
+        hits = _fragment_stats['hits']
+        misses = _fragment_stats['misses']
+    total = hits + misses
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_ratio': hits / total if total else 0.0,
+    }
+
+
+def reset_fragment_cache_stats():
+    with _fragment_stats_lock:
+        _fragment_stats.clear()
+
+
+def render_post_card(post, render):
+    key = f'blog:post_card:{post.pk}:{post_card_version(post)}'
+    cache = get_feed_cache()
+    html = cache.get(key)
+    if html is not None:
+        _count_fragment('hits')
+        return html
+    _count_fragment('misses')
+    html = render()
+    cache.set(key, html, settings.POST_CARD_CACHE_TIMEOUT)
+    return html
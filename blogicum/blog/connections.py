@@ -0,0 +1,51 @@
+"""Повторное использование соединений с БД и их метрики.
+
+Соединения живут ``CONN_MAX_AGE`` секунд. В начале каждого запроса
+открытые соединения проверяются (``DB_HEALTH_CHECKS``): закрытое сервером
+или сломанное соединение закрывается, и Django откроет новое при первом
+запросе к базе, вместо того чтобы запрос упал с ошибкой. Счётчики
+ведутся отдельно в каждом процессе-воркере.
+"""
+import os
+import threading
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.db import connections
+
+_stats = defaultdict(Counter)
+_stats_lock = threading.Lock()
+
+
+def record(alias, event):
+    with _stats_lock:
+        _stats[alias][event] += 1
+
+
+def get_connection_stats():
+    with _stats_lock:
+        databases = {
+            alias: {
+                event: counter[event]
+                for event in ('opened', 'reused', 'errors')
+            }
+            for alias, counter in _stats.items()
+        }
+    return {'pid': os.getpid(), 'databases': databases}
+
+
+def reset_connection_stats():
+    with _stats_lock:
+        _stats.clear()
+
+
+def check_connections():
+    """Проверяет соединения текущего потока перед обработкой запроса."""
+    for connection in connections.all():
+        if connection.connection is None or connection.in_atomic_block:
+            continue
+        if settings.DB_HEALTH_CHECKS and not connection.is_usable():
+            record(connection.alias, 'errors')
+            connection.close()
+            continue
+        record(connection.alias, 'reused')
@@ -1,6 +1,9 @@
 from django import forms
+from django.contrib.auth.forms import PasswordResetForm
+from django.template import loader
 
 from .models import Post, Comment
+from .tasks import send_email
 
 
 class PostCreateForm(forms.ModelForm):
@@ -17,3 +20,24 @@ class CommentForm(forms.ModelForm):
     class Meta:
         model = Comment
         fields = ['text']
+
+
+class QueuedPasswordResetForm(PasswordResetForm):
+    """Письмо со ссылкой для сброса пароля отправляет фоновая задача."""
+
+    def send_mail(self, subject_template_name, email_template_name,
+                  context, from_email, to_email,
+                  html_email_template_name=None):
+        subject = ''.join(
+            loader.render_to_string(subject_template_name, context)
+            .splitlines()
+        )
+        body = loader.render_to_string(email_template_name, context)
+        html_body = None
+        if html_email_template_name is not None:
+            html_body = loader.render_to_string(
+                html_email_template_name, context
+            )
+        send_email.delay(
+            subject, body, from_email, [to_email], html_message=html_body
+        )
@@ -0,0 +1,180 @@
+"""Число и время запросов к БД, рендеринга и всего запроса по представлениям.
+
+Обёртка ``count_query`` ставится на каждое новое соединение и учитывает
+запросы в метриках текущего HTTP-запроса, если они есть. Метрики лежат в
+contextvar, поэтому сюда же попадают запросы из потоков пула асинхронных
+представлений. Гистограммы ведутся отдельно в каждом процессе-воркере.
+"""
+import asyncio
+import bisect
+import logging
+import os
+import threading
+import time
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.utils.deprecation import MiddlewareMixin
+
+logger = logging.getLogger(__name__)
+
+MS_BUCKETS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+QUERY_BUCKETS = (1, 2, 5, 10, 20, 50, 100)
+
+_current = ContextVar('request_metrics', default=None)
+_histograms = {}
+_histograms_lock = threading.Lock()
+
+
+class RequestMetrics:
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.render_time = 0.0
+        self.render_started = None
+
+    def start_render(self):
+        self.render_started = time.perf_counter()
+
+    def stop_render(self):
+        if self.render_started is not None:
+            self.render_time += time.perf_counter() - self.render_started
+            self.render_started = None
+
+
+def count_query(execute, sql, params, many, context):
+    metrics = _current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.queries += 1
+        metrics.db_time += time.perf_counter() - started
+
+
+def install_query_counter(connection):
+    if count_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(count_query)
+
+
+def render_response(response):
+    """Рендерит ответ, учитывая время в метриках текущего запроса."""
+    metrics = _current.get()
+    if metrics is not None:
+        metrics.start_render()
+    response = response.render()
+    if metrics is not None:
+        metrics.stop_render()
+    return response
+
+
+def _histogram(buckets):
+    return [0] * (len(buckets) + 1)
+
+
+def _observe(view_name, metrics, total_ms, over_budget):
+    values = {
+        'queries': (metrics.queries, QUERY_BUCKETS),
+        'db_ms': (metrics.db_time * 1000, MS_BUCKETS),
+        'render_ms': (metrics.render_time * 1000, MS_BUCKETS),
+        'total_ms': (total_ms, MS_BUCKETS),
+    }
+    with _histograms_lock:
+        stats = _histograms.get(view_name)
+        if stats is None:
+            stats = _histograms[view_name] = {
+                'requests': 0, 'over_budget': 0,
+                **{
+                    name: {'sum': 0, 'histogram': _histogram(buckets)}
+                    for name, (_, buckets) in values.items()
+                },
+            }
+        stats['requests'] += 1
+        stats['over_budget'] += over_budget
+        for name, (value, buckets) in values.items():
+            stats[name]['sum'] += value
+            stats[name]['histogram'][bisect.bisect_left(buckets, value)] += 1
+
+
+def get_request_stats():
+    with _histograms_lock:
+        views = {
+            name: {
+                key: dict(value) if isinstance(value, dict) else value
+                for key, value in stats.items()
+            }
+            for name, stats in _histograms.items()
+        }
+    return {
+        'pid': os.getpid(),
+        'buckets': {'queries': QUERY_BUCKETS, 'ms': MS_BUCKETS},
+        'views': views,
+    }
+
+
+def reset_request_stats():
+    with _histograms_lock:
+        _histograms.clear()
+
+
+def query_budget(view_name):
+    return settings.QUERY_BUDGETS.get(view_name, settings.QUERY_BUDGET)
+
+
+class QueryTimingMiddleware(MiddlewareMixin):
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self):
+            return self.__acall__(request)
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(request, response, metrics, started)
+
+    async def __acall__(self, request):
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        started = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(request, response, metrics, started)
+
+    def finish(self, request, response, metrics, started):
+        total_ms = (time.perf_counter() - started) * 1000
+        match = request.resolver_match
+        if match is None:
+            return response
+        budget = query_budget(match.view_name)
+        over_budget = metrics.queries > budget
+        if over_budget:
+            logger.warning(
+                '%s %s: %d запросов к БД при бюджете %d',
+                match.view_name, request.get_full_path(),
+                metrics.queries, budget
+            )
+        _observe(match.view_name, metrics, total_ms, over_budget)
+        if settings.SERVER_TIMING:
+            response['Server-Timing'] = ', '.join((
+                f'db;dur={metrics.db_time * 1000:.1f};'
+                f'desc="{metrics.queries} queries"',
+                f'tpl;dur={metrics.render_time * 1000:.1f}',
+                f'total;dur={total_ms:.1f}',
+            ))
+        return response
+
+    def process_template_response(self, request, response):
+        # Вызывается непосредственно перед рендерингом шаблона.
+        metrics = _current.get()
+        if metrics is not None and not response.is_rendered:
+            metrics.start_render()
+            response.add_post_render_callback(
+                lambda rendered: metrics.stop_render()
+            )
+        return response
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from blog.models import Post
+from blog.thumbnails import make_post_thumbnails
+
+
+class Command(BaseCommand):
+    help = 'Создаёт уменьшенные копии фото публикаций.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--all', action='store_true',
+            help='Пересоздать копии и у уже обработанных публикаций.'
+        )
+
+    def handle(self, *args, all=False, **options):
+        posts = Post.objects.exclude(image='')
+        if not all:
+            posts = posts.filter(image_widths=[])
+        rows = posts.order_by('pk').values_list('pk', 'image')
+        processed = 0
+        for post_id, image_name in rows.iterator():
+            make_post_thumbnails(post_id, image_name)
+            processed += 1
+        self.stdout.write(self.style.SUCCESS(
+            f'Обработано публикаций: {processed}'
+        ))
@@ -0,0 +1,126 @@
+import posixpath
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from blog.models import MediaBlob, Post
+from blog.storage import (
+    TEMP_PREFIX,
+    is_variant,
+    recently_modified,
+    variant_root,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Удаляет файлы фото и их уменьшенные копии, на которые не ссылается'
+        ' ни одна публикация.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Только показать, какие файлы были бы удалены.'
+        )
+        parser.add_argument(
+            '--grace', type=int, default=settings.MEDIA_GC_GRACE_SECONDS,
+            help='Не трогать файлы моложе стольких секунд.'
+        )
+        parser.add_argument(
+            '--max-dirs', type=int, default=None,
+            help='Обработать не больше стольких каталогов за запуск.'
+        )
+        parser.add_argument(
+            '--start-after', default=None,
+            help='Продолжить обход после указанного каталога.'
+        )
+        parser.add_argument(
+            '--recount', action='store_true',
+            help='Сначала пересчитать ссылки на файлы по публикациям.'
+        )
+
+    def handle(self, *args, dry_run=False, grace, max_dirs=None,
+               start_after=None, recount=False, **options):
+        if recount and not dry_run:
+            blobs = MediaBlob.objects.recount()
+            self.stdout.write(f'Пересчитано файлов со ссылками: {blobs}')
+
+        field = Post._meta.get_field('image')
+        self.storage = field.storage
+        self.dry_run = dry_run
+        self.grace = grace
+        checked = deleted = freed = processed = 0
+        last_directory = start_after
+        for directory in self.directories(field.upload_to, start_after):
+            if max_dirs is not None and processed >= max_dirs:
+                self.stdout.write(
+                    f'Продолжить обход: --start-after {last_directory}'
+                )
+                break
+            files, orphans = self.orphans(directory)
+            checked += files
+            for name, size in orphans:
+                self.stdout.write(name, self.style.WARNING)
+                deleted += 1
+                freed += size
+            processed += 1
+            last_directory = directory
+
+        verb = 'Будет удалено' if dry_run else 'Удалено'
+        self.stdout.write(self.style.SUCCESS(
+            f'Проверено файлов: {checked}. {verb} файлов: {deleted},'
+            f' {freed / 2 ** 20:.1f} МиБ.'
+        ))
+
+    def directories(self, root, start_after=None):
+        """Каталоги хранилища по порядку, начиная после ``start_after``."""
+        stack = [root]
+        skipping = start_after is not None
+        while stack:
+            directory = stack.pop()
+            try:
+                subdirectories, _ = self.storage.listdir(directory)
+            except FileNotFoundError:
+                continue
+            stack.extend(
+                posixpath.join(directory, name)
+                for name in sorted(subdirectories, reverse=True)
+            )
+            if not skipping:
+                yield directory
+            elif directory == start_after:
+                skipping = False
+
+    def orphans(self, directory):
+        """Удаляет файлы каталога без ссылок; возвращает их с размерами."""
+        _, files = self.storage.listdir(directory)
+        live = {
+            posixpath.basename(name)
+            for name in Post.objects.filter(
+                image__startswith=directory + '/'
+            ).values_list('image', flat=True)
+            if posixpath.dirname(name) == directory
+        }
+        live_roots = {variant_root(name) for name in live}
+
+        orphans = []
+        for filename in files:
+            if filename.startswith(TEMP_PREFIX):
+                is_live = False
+            elif is_variant(filename):
+                is_live = variant_root(filename) in live_roots
+            else:
+                is_live = filename in live
+            name = posixpath.join(directory, filename)
+            if is_live or recently_modified(self.storage, name, self.grace):
+                continue
+            orphans.append((name, self.storage.size(name)))
+
+        if not self.dry_run:
+            for name, _ in orphans:
+                self.storage.delete(name)
+            MediaBlob.objects.filter(
+                pk__in=[name for name, _ in orphans]
+            ).delete()
+        return len(files), orphans
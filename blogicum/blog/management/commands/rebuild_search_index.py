@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from blog.search import fts_available, rebuild_index, write_connection
+
+
+class Command(BaseCommand):
+    help = 'Перестраивает полнотекстовый индекс публикаций (SQLite FTS5).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=2000)
+
+    def handle(self, *args, batch_size, **options):
+        if not fts_available(write_connection()):
+            raise CommandError(
+                'Таблица FTS5 не найдена: примените миграции blog. '
+                'На PostgreSQL индекс обновляется самой базой.'
+            )
+        indexed = rebuild_index(batch_size)
+        self.stdout.write(self.style.SUCCESS(
+            f'Проиндексировано публикаций: {indexed}'
+        ))
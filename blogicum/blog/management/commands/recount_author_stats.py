@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from blog.models import AuthorStats
+
+
+class Command(BaseCommand):
+    help = 'Пересобирает сохранённую статистику авторов.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user', type=int, nargs='*', dest='user_ids',
+            help='Пересчитать только пользователей с указанными id.'
+        )
+
+    def handle(self, *args, user_ids=None, **options):
+        recounted = AuthorStats.objects.recount(user_ids=user_ids or None)
+        self.stdout.write(self.style.SUCCESS(
+            f'Пересчитано записей статистики: {recounted}'
+        ))
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from blog.models import Post
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает сохранённые счётчики комментариев у публикаций.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--post', type=int, nargs='*', dest='post_ids',
+            help='Пересчитать только публикации с указанными id.'
+        )
+
+    def handle(self, *args, post_ids=None, **options):
+        posts = Post.objects.all()
+        if post_ids:
+            posts = posts.filter(pk__in=post_ids)
+        fixed = posts.recount_comments()
+        self.stdout.write(self.style.SUCCESS(
+            f'Исправлено счётчиков комментариев: {fixed}'
+        ))
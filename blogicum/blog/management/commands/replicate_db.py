@@ -0,0 +1,50 @@
+import sqlite3
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS
+
+
+def copy_sqlite_database(source, target):
+    """Копирует базу целиком через backup API SQLite.
+
+    Копия согласована на момент начала, даже если в источник пишут.
+    """
+    source_connection = sqlite3.connect(source)
+    target_connection = sqlite3.connect(target)
+    try:
+        source_connection.backup(target_connection)
+    finally:
+        target_connection.close()
+        source_connection.close()
+
+
+class Command(BaseCommand):
+    help = (
+        'Заменяет репликацию при локальной разработке: копирует основную'
+        ' базу SQLite в файлы реплик из DATABASE_REPLICAS.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval', type=float, default=0,
+            help='Повторять копирование каждые N секунд.'
+        )
+
+    def handle(self, *args, interval=0, **options):
+        databases = settings.DATABASES
+        if not settings.DATABASE_REPLICAS:
+            raise CommandError('В DATABASE_REPLICAS не указаны реплики.')
+        for alias in (DEFAULT_DB_ALIAS, *settings.DATABASE_REPLICAS):
+            if 'sqlite3' not in databases[alias]['ENGINE']:
+                raise CommandError(f'База {alias} — не SQLite.')
+
+        source = databases[DEFAULT_DB_ALIAS]['NAME']
+        while True:
+            for alias in settings.DATABASE_REPLICAS:
+                copy_sqlite_database(source, databases[alias]['NAME'])
+                self.stdout.write(f'{alias}: скопировано из {source}')
+            if not interval:
+                break
+            time.sleep(interval)
@@ -0,0 +1,20 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from blog.warmup import warm_templates
+
+
+class Command(BaseCommand):
+    help = 'Заранее компилирует шаблоны проекта в кэширующем загрузчике.'
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        warmed = warm_templates()
+        elapsed = (time.perf_counter() - started) * 1000
+        if options['verbosity'] > 1:
+            for name in warmed:
+                self.stdout.write(name)
+        self.stdout.write(self.style.SUCCESS(
+            f'Скомпилировано шаблонов: {len(warmed)} за {elapsed:.1f} мс'
+        ))
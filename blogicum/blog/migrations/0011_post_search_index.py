@@ -0,0 +1,53 @@
+# Generated by Django 3.2.16 on 2026-10-17 08:05
+
+from django.db import migrations
+
+# Выражение повторяет SearchVector из blog.search, иначе планировщик
+# PostgreSQL не воспользуется индексом.
+PG_SEARCH_VECTOR = (
+    "setweight(to_tsvector('russian'::regconfig, COALESCE(\"title\", '')),"
+    " 'A') || "
+    "setweight(to_tsvector('russian'::regconfig, COALESCE(\"text\", '')),"
+    " 'B')"
+)
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute(
+            'CREATE INDEX IF NOT EXISTS blog_post_search_idx ON blog_post'
+            f' USING GIN (({PG_SEARCH_VECTOR}))'
+        )
+    elif vendor == 'sqlite':
+        schema_editor.execute(
+            'CREATE VIRTUAL TABLE IF NOT EXISTS blog_post_fts USING fts5('
+            "title, text, tokenize='unicode61 remove_diacritics 2')"
+        )
+        Post = apps.get_model('blog', 'Post')
+        rows = Post.objects.order_by().values_list('pk', 'title', 'text')
+        with schema_editor.connection.cursor() as cursor:
+            cursor.executemany(
+                'INSERT INTO blog_post_fts (rowid, title, text)'
+                ' VALUES (%s, %s, %s)',
+                rows.iterator()
+            )
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute('DROP INDEX IF EXISTS blog_post_search_idx')
+    elif vendor == 'sqlite':
+        schema_editor.execute('DROP TABLE IF EXISTS blog_post_fts')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0010_updated_at'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 3.2.16 on 2026-10-17 06:41
+
+import blog.storage
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def fill_media_blobs(apps, schema_editor):
+    MediaBlob = apps.get_model('blog', 'MediaBlob')
+    Post = apps.get_model('blog', 'Post')
+    counts = (
+        Post.objects.exclude(image='').order_by()
+        .values('image').annotate(total=Count('pk'))
+        .values_list('image', 'total')
+    )
+    MediaBlob.objects.bulk_create(
+        (MediaBlob(name=name, ref_count=total) for name, total in counts),
+        batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0013_post_image_widths'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MediaBlob',
+            fields=[
+                ('name', models.CharField(max_length=100, primary_key=True, serialize=False, verbose_name='Файл')),
+                ('ref_count', models.PositiveIntegerField(default=0, verbose_name='Количество ссылок')),
+            ],
+            options={
+                'verbose_name': 'файл фото',
+                'verbose_name_plural': 'Файлы фото',
+            },
+        ),
+        migrations.AlterField(
+            model_name='post',
+            name='image',
+            field=models.ImageField(blank=True, storage=blog.storage.ContentAddressedStorage(), upload_to='post_images', verbose_name='Фото'),
+        ),
+        migrations.RunPython(fill_media_blobs, migrations.RunPython.noop),
+    ]
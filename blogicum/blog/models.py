@@ -1,11 +1,31 @@
 from django.contrib.auth import get_user_model
 from django.db import models
-from django.db.models import Count
+from django.db import transaction
+from django.db.models import Count, F, Max, OuterRef, Subquery
+from django.db.models.functions import Coalesce, Greatest
 from django.utils import timezone
 
+from .cache import invalidate_feed_cache
+from .storage import delete_blob, post_image_storage
+
 User = get_user_model()
 
 
+class TouchingQuerySet(models.QuerySet):
+    """update() обновляет updated_at и кэш ленты, как save() с сигналами.
+
+    Массовые правки (действия админки, команды управления) идут мимо
+    save(), а от updated_at зависят ETag и Last-Modified страниц.
+    """
+
+    def update(self, **kwargs):
+        kwargs.setdefault('updated_at', timezone.now())
+        updated = super().update(**kwargs)
+        if updated:
+            invalidate_feed_cache()
+        return updated
+
+
 class Category(models.Model):
     title = models.CharField(max_length=256, verbose_name='Заголовок')
     description = models.TextField(verbose_name='Описание')
@@ -26,6 +46,12 @@ class Category(models.Model):
         auto_now_add=True,
         verbose_name='Добавлено'
     )
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Изменено'
+    )
+
+    objects = TouchingQuerySet.as_manager()
 
     class Meta:
         verbose_name = 'категория'
@@ -49,6 +75,12 @@ class Location(models.Model):
         auto_now_add=True,
         verbose_name='Добавлено'
     )
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Изменено'
+    )
+
+    objects = TouchingQuerySet.as_manager()
 
     class Meta:
         verbose_name = 'местоположение'
@@ -58,6 +90,66 @@ class Location(models.Model):
         return self.name
 
 
+class PostQuerySet(TouchingQuerySet):
+    FEED_FIELDS = (
+        'id', 'title', 'text', 'pub_date', 'is_published', 'image',
+        'image_widths', 'comment_count',
+        'author__username',
+        'category__title', 'category__slug', 'category__is_published',
+        'location__name', 'location__is_published',
+    )
+
+    def published(self):
+        return self.filter(
+            pub_date__lte=timezone.now(),
+            is_published=True,
+            category__is_published=True
+        )
+
+    def recount_comments(self):
+        actual_count = Coalesce(Subquery(
+            Comment.objects.filter(post=OuterRef('pk'))
+            .order_by().values('post')
+            .annotate(total=Count('pk')).values('total')
+        ), 0)
+        stale = self.annotate(actual_count=actual_count).exclude(
+            comment_count=F('actual_count')
+        )
+        return self.filter(pk__in=stale.values('pk')).update(
+            comment_count=actual_count
+        )
+
+    def feed_state(self):
+        latest_pub_date = Post.objects.filter(
+            is_published=True, pub_date__lte=timezone.now()
+        ).order_by('-pub_date').values('pub_date')[:1]
+        return self.order_by('-updated_at').annotate(
+            latest_pub_date=Subquery(latest_pub_date),
+            categories_updated_at=Subquery(
+                Category.objects.order_by('-updated_at')
+                .values('updated_at')[:1]
+            ),
+            locations_updated_at=Subquery(
+                Location.objects.order_by('-updated_at')
+                .values('updated_at')[:1]
+            ),
+        ).values(
+            'updated_at', 'latest_pub_date',
+            'categories_updated_at', 'locations_updated_at',
+        ).first()
+
+    def detail_state(self, pk):
+        return self.filter(pk=pk).values(
+            'updated_at', 'pub_date', 'is_published', 'comment_count',
+            'author_id', 'category__updated_at', 'location__updated_at',
+        ).first()
+
+    def for_feed(self):
+        return self.select_related(
+            'author', 'category', 'location'
+        ).only(*self.FEED_FIELDS)
+
+
 class Post(models.Model):
     title = models.CharField(
         max_length=256,
@@ -101,30 +193,70 @@ class Post(models.Model):
     image = models.ImageField(
         verbose_name='Фото',
         upload_to='post_images',
+        storage=post_image_storage,
         blank=True
     )
+    image_widths = models.JSONField(
+        default=list,
+        editable=False,
+        verbose_name='Ширины уменьшенных копий фото'
+    )
+    comment_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Количество комментариев'
+    )
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Изменено'
+    )
+
+    objects = PostQuerySet.as_manager()
 
     class Meta:
         verbose_name = 'публикация'
         verbose_name_plural = 'Публикации'
         ordering = ['-pub_date']
+        indexes = [
+            models.Index(
+                fields=['-pub_date', '-id'],
+                condition=models.Q(is_published=True),
+                name='post_feed_idx'
+            ),
+            models.Index(
+                fields=['category', '-pub_date', '-id'],
+                condition=models.Q(is_published=True),
+                name='post_category_feed_idx'
+            ),
+            models.Index(
+                fields=['author', '-pub_date', '-id'],
+                name='post_author_feed_idx'
+            ),
+            models.Index(
+                fields=['-updated_at'],
+                name='post_updated_idx'
+            ),
+        ]
 
     def __str__(self):
         return self.title
 
     @classmethod
-    def published(cls, is_for_author):
+    def from_db(cls, db, field_names, values):
+        post = super().from_db(db, field_names, values)
+        # Сохранённое фото: при замене его файл нужно освободить.
+        post._loaded_image = post.__dict__.get('image')
+        return post
+
+    @classmethod
+    def feed(cls, is_for_author=False):
         if is_for_author:
-            posts = cls.objects
+            posts = cls.objects.all()
 
         else:
-            posts = cls.objects.filter(
-                pub_date__lte=timezone.now(),
-                is_published=True,
-                category__is_published=True
-            )
+            posts = cls.objects.published()
 
-        return posts.annotate(comment_count=Count('comments'))
+        return posts.for_feed().order_by(*cls._meta.ordering)
 
 
 class Comment(models.Model):
@@ -140,8 +272,164 @@ class Comment(models.Model):
 
     class Meta:
         ordering = ('created_at',)
+        indexes = [
+            models.Index(
+                fields=['post', 'created_at'],
+                name='comment_post_created_idx'
+            ),
+        ]
         verbose_name = 'комментарий'
         verbose_name_plural = 'Комментарии'
 
     def __str__(self):
         return self.text[:20]
+
+
+def author_total(model, aggregate, author):
+    """Подзапрос с агрегатом по объектам ``model`` автора ``author``."""
+    return Subquery(
+        model.objects.filter(author=OuterRef(author))
+        .order_by().values('author')
+        .annotate(value=aggregate).values('value')
+    )
+
+
+class AuthorStatsQuerySet(models.QuerySet):
+    def refresh(self, user_id, create=True):
+        """Пересчитывает строку автора одним UPDATE по его объектам.
+
+        Пересчёт, в отличие от приращений, можно повторять и выполнять в
+        любом порядке: запоздавшая задача не посчитает объект дважды.
+        Без ``create`` отсутствующая строка не создаётся — так при удалении
+        пользователя каскад не пересоздаёт его статистику.
+        """
+        last_post = author_total(Post, Max('created_at'), 'user_id')
+        last_comment = author_total(Comment, Max('created_at'), 'user_id')
+        updated = self.filter(pk=user_id).update(
+            post_count=Coalesce(
+                author_total(Post, Count('pk'), 'user_id'), 0
+            ),
+            comment_count=Coalesce(
+                author_total(Comment, Count('pk'), 'user_id'), 0
+            ),
+            last_activity=Greatest(
+                Coalesce(last_post, last_comment),
+                Coalesce(last_comment, last_post)
+            ),
+        )
+        if not updated and create:
+            self.recount(user_ids=[user_id])
+
+    def recount(self, user_ids=None):
+        users = User.objects.order_by()
+        if user_ids is not None:
+            users = users.filter(pk__in=user_ids)
+        rows = users.annotate(
+            post_total=Coalesce(author_total(Post, Count('pk'), 'pk'), 0),
+            comment_total=Coalesce(
+                author_total(Comment, Count('pk'), 'pk'), 0
+            ),
+            last_post=author_total(Post, Max('created_at'), 'pk'),
+            last_comment=author_total(Comment, Max('created_at'), 'pk'),
+        ).values_list(
+            'pk', 'post_total', 'comment_total', 'last_post', 'last_comment'
+        )
+        stats = [
+            AuthorStats(
+                user_id=pk, post_count=posts, comment_count=comments,
+                last_activity=max(
+                    filter(None, (last_post, last_comment)), default=None
+                )
+            )
+            for pk, posts, comments, last_post, last_comment in rows
+        ]
+        with transaction.atomic():
+            self.filter(pk__in=[item.user_id for item in stats]).delete()
+            self.bulk_create(stats)
+        return len(stats)
+
+
+class AuthorStats(models.Model):
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='blog_stats',
+        verbose_name='Пользователь'
+    )
+    post_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Количество публикаций'
+    )
+    comment_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Количество комментариев'
+    )
+    last_activity = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='Последняя активность'
+    )
+
+    objects = AuthorStatsQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = 'статистика автора'
+        verbose_name_plural = 'Статистика авторов'
+
+    def __str__(self):
+        return f'{self.user}: {self.post_count} / {self.comment_count}'
+
+
+class MediaBlobQuerySet(models.QuerySet):
+    def acquire(self, name):
+        if not self.filter(pk=name).update(ref_count=F('ref_count') + 1):
+            _, created = self.get_or_create(
+                pk=name, defaults={'ref_count': 1}
+            )
+            if not created:
+                self.filter(pk=name).update(ref_count=F('ref_count') + 1)
+
+    def release(self, name):
+        """Уменьшает счётчик; последняя ссылка удаляет файл после коммита."""
+        self.filter(pk=name, ref_count__gt=0).update(
+            ref_count=F('ref_count') - 1
+        )
+        deleted, _ = self.filter(pk=name, ref_count=0).delete()
+        if deleted:
+            transaction.on_commit(lambda: delete_blob(name))
+
+    def recount(self):
+        counts = (
+            Post.objects.exclude(image='').order_by()
+            .values('image').annotate(total=Count('pk'))
+            .values_list('image', 'total')
+        )
+        blobs = [
+            MediaBlob(name=name, ref_count=total) for name, total in counts
+        ]
+        with transaction.atomic():
+            self.all().delete()
+            self.bulk_create(blobs, batch_size=1000)
+        return len(blobs)
+
+
+class MediaBlob(models.Model):
+    name = models.CharField(
+        max_length=100,
+        primary_key=True,
+        verbose_name='Файл'
+    )
+    ref_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Количество ссылок'
+    )
+
+    objects = MediaBlobQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = 'файл фото'
+        verbose_name_plural = 'Файлы фото'
+
+    def __str__(self):
+        return f'{self.name}: {self.ref_count}'
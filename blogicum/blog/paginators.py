@@ -0,0 +1,134 @@
+import base64
+import binascii
+import json
+from collections.abc import Sequence
+
+from django.core.paginator import InvalidPage
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+# Диапазон BigAutoField / INTEGER в SQLite: за его пределами драйвер БД
+# бросает OverflowError вместо пустой выборки.
+MIN_PK = -2 ** 63
+MAX_PK = 2 ** 63 - 1
+
+
+class InvalidCursor(InvalidPage):
+    pass
+
+
+class CursorPage(Sequence):
+    is_cursor_page = True
+
+    def __init__(self, object_list, next_cursor, previous_cursor):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __repr__(self):
+        return f'<Cursor page of {len(self)} items>'
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class CursorPaginator:
+    """Keyset-пагинация по (pub_date, id) без COUNT(*) и OFFSET.
+
+    Стоимость выборки страницы не зависит от её «глубины»: каждая страница
+    читается по индексу от позиции, закодированной в курсоре.
+    """
+
+    ordering = ('-pub_date', '-id')
+
+    def __init__(self, queryset, per_page):
+        self.queryset = queryset.order_by(*self.ordering)
+        self.per_page = per_page
+
+    @staticmethod
+    def encode_cursor(post, backwards=False):
+        position = {'d': post.pub_date.isoformat(), 'i': post.pk}
+        if backwards:
+            position['b'] = 1
+        raw = json.dumps(position, separators=(',', ':')).encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+    @staticmethod
+    def decode_cursor(cursor):
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            position = json.loads(base64.urlsafe_b64decode(padded))
+            pub_date = parse_datetime(position['d'])
+            if pub_date is not None and timezone.is_aware(pub_date):
+                # Сдвиг в UTC здесь, а не в запросе: дата у границ
+                # datetime иначе переполняется при подстановке в SQL.
+                pub_date = pub_date.astimezone(timezone.utc)
+            pk = int(position['i'])
+            backwards = bool(position.get('b'))
+        except (
+            binascii.Error, ValueError, KeyError, TypeError, AttributeError,
+            OverflowError,
+        ):
+            raise InvalidCursor('Некорректный курсор страницы.')
+        if (
+            pub_date is None or timezone.is_naive(pub_date)
+            or not MIN_PK <= pk <= MAX_PK
+        ):
+            raise InvalidCursor('Некорректный курсор страницы.')
+        return pub_date, pk, backwards
+
+    def page(self, cursor=None):
+        if not cursor:
+            return self._forward_page(self.queryset, has_previous=False)
+
+        pub_date, pk, backwards = self.decode_cursor(cursor)
+        if backwards:
+            queryset = self.queryset.filter(
+                Q(pub_date__gt=pub_date) | Q(pub_date=pub_date, id__gt=pk)
+            )
+            return self._backward_page(queryset)
+        queryset = self.queryset.filter(
+            Q(pub_date__lt=pub_date) | Q(pub_date=pub_date, id__lt=pk)
+        )
+        return self._forward_page(queryset, has_previous=True)
+
+    def _forward_page(self, queryset, has_previous):
+        rows = list(queryset[:self.per_page + 1])
+        object_list = rows[:self.per_page]
+        return self._make_page(
+            object_list,
+            has_next=len(rows) > self.per_page,
+            has_previous=has_previous and bool(object_list),
+        )
+
+    def _backward_page(self, queryset):
+        rows = list(queryset.reverse()[:self.per_page + 1])
+        object_list = rows[:self.per_page][::-1]
+        return self._make_page(
+            object_list,
+            has_next=bool(object_list),
+            has_previous=len(rows) > self.per_page,
+        )
+
+    def _make_page(self, object_list, has_next, has_previous):
+        next_cursor = previous_cursor = None
+        if has_next:
+            next_cursor = self.encode_cursor(object_list[-1])
+        if has_previous:
+            previous_cursor = self.encode_cursor(
+                object_list[0], backwards=True
+            )
+        return CursorPage(object_list, next_cursor, previous_cursor)
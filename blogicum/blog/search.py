@@ -0,0 +1,252 @@
+"""Полнотекстовый поиск по публикациям.
+
+На SQLite используется виртуальная таблица FTS5 ``blog_post_fts`` (rowid
+совпадает с id публикации), на PostgreSQL — ``tsvector`` с GIN-индексом.
+Если ни то ни другое недоступно, поиск сводится к ``icontains``.
+
+Индекс обновляется в базе для записи, а ищется в базе для чтения, которую
+выбирает роутер: страница поиска может читать с реплики.
+"""
+import logging
+import re
+
+from django.conf import settings
+from django.db import DatabaseError, connections, router
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+FTS_TABLE = 'blog_post_fts'
+PG_CONFIG = 'russian'
+WORD_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def search_words(query):
+    return WORD_RE.findall(query)[:16]
+
+
+_fts_databases = set()
+
+
+def write_connection():
+    from .models import Post
+
+    return connections[router.db_for_write(Post)]
+
+
+def fts_available(connection):
+    if connection.vendor != 'sqlite':
+        return False
+    name = connection.settings_dict['NAME']
+    if name not in _fts_databases:
+        if FTS_TABLE not in connection.introspection.table_names():
+            return False
+        _fts_databases.add(name)
+    return True
+
+
+def index_post(post):
+    connection = write_connection()
+    if not fts_available(connection):
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [post.pk]
+        )
+        cursor.execute(
+            f'INSERT INTO {FTS_TABLE} (rowid, title, text)'
+            ' VALUES (%s, %s, %s)',
+            [post.pk, post.title, post.text]
+        )
+
+
+def unindex_post(post_id):
+    connection = write_connection()
+    if not fts_available(connection):
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [post_id]
+        )
+
+
+def rebuild_index(batch_size=2000):
+    from .models import Post
+
+    connection = write_connection()
+    if not fts_available(connection):
+        return 0
+    indexed = 0
+    rows = Post.objects.using(connection.alias).order_by().values_list(
+        'pk', 'title', 'text'
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {FTS_TABLE}')
+        batch = []
+        for row in rows.iterator(chunk_size=batch_size):
+            batch.append(row)
+            if len(batch) == batch_size:
+                indexed += _insert_batch(cursor, batch)
+                batch = []
+        indexed += _insert_batch(cursor, batch)
+        cursor.execute(
+            f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('optimize')"
+        )
+    return indexed
+
+
+def _insert_batch(cursor, batch):
+    if batch:
+        cursor.executemany(
+            f'INSERT INTO {FTS_TABLE} (rowid, title, text)'
+            ' VALUES (%s, %s, %s)',
+            batch
+        )
+    return len(batch)
+
+
+def _fts_match_expression(words):
+    # Каждое слово — отдельная строка в кавычках с поиском по префиксу,
+    # чтобы пользовательский ввод не разбирался как синтаксис FTS5.
+    return ' '.join(f'"{word}"*' for word in words)
+
+
+def _sqlite_ranked_ids(connection, words, published_only, limit):
+    half_life = settings.SEARCH_RECENCY_HALF_LIFE_DAYS
+    filters = ''
+    params = [_fts_match_expression(words)]
+    if published_only:
+        filters = (
+            ' AND p.is_published AND p.pub_date <= %s'
+            ' AND p.category_id IN (SELECT id FROM blog_category'
+            ' WHERE is_published)'
+        )
+        params.append(
+            connection.ops.adapt_datetimefield_value(timezone.now())
+        )
+    params += [half_life, limit]
+    # bm25() отрицателен и тем меньше, чем релевантнее документ; деление
+    # на фактор давности приближает к нулю (ухудшает) старые публикации.
+    # Возраст будущих публикаций считается нулевым, иначе делитель может
+    # стать отрицательным или нулём.
+    sql = (
+        f'SELECT p.id FROM {FTS_TABLE} f'
+        ' JOIN blog_post p ON p.id = f.rowid'
+        f' WHERE {FTS_TABLE} MATCH %s{filters}'
+        f' ORDER BY bm25({FTS_TABLE}, 10.0, 1.0)'
+        " / (1 + max(julianday('now') - julianday(p.pub_date), 0) / %s)"
+        ' LIMIT %s'
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return [row[0] for row in cursor.fetchall()]
+
+
+def _postgres_search(words):
+    from django.contrib.postgres.search import SearchQuery, SearchVector
+
+    # Должно совпадать с выражением GIN-индекса из миграции 0011.
+    vector = (
+        SearchVector('title', weight='A', config=PG_CONFIG)
+        + SearchVector('text', weight='B', config=PG_CONFIG)
+    )
+    query = SearchQuery(' & '.join(f'{word}:*' for word in words),
+                        search_type='raw', config=PG_CONFIG)
+    return vector, query
+
+
+def _postgres_ranked_ids(using, words, published_only, limit):
+    from django.contrib.postgres.search import SearchRank
+    from django.db.models import ExpressionWrapper, F, FloatField, Value
+    from django.db.models.functions import Extract, Greatest, Now
+
+    from .models import Post
+
+    vector, query = _postgres_search(words)
+    posts = Post.objects.using(using)
+    if published_only:
+        posts = posts.published()
+    age_days = Greatest(
+        Extract(Now() - F('pub_date'), 'epoch') / 86400, Value(0)
+    )
+    score = ExpressionWrapper(
+        SearchRank(vector, query)
+        / (1 + age_days / settings.SEARCH_RECENCY_HALF_LIFE_DAYS),
+        output_field=FloatField()
+    )
+    return list(
+        posts.annotate(search=vector).filter(search=query)
+        .annotate(score=score).order_by('-score')
+        .values_list('pk', flat=True)[:limit]
+    )
+
+
+def _fallback_filter(posts, words):
+    for word in words:
+        posts = posts.filter(
+            Q(title__icontains=word) | Q(text__icontains=word)
+        )
+    return posts
+
+
+def _fallback_ranked_ids(using, words, published_only, limit):
+    from .models import Post
+
+    posts = Post.objects.using(using)
+    if published_only:
+        posts = posts.published()
+    return list(
+        _fallback_filter(posts, words).order_by('-pub_date')
+        .values_list('pk', flat=True)[:limit]
+    )
+
+
+def ranked_post_ids(query, published_only=True, limit=None):
+    """Список id публикаций по убыванию релевантности и свежести."""
+    from .models import Post
+
+    words = search_words(query)
+    if not words:
+        return []
+    limit = limit or settings.SEARCH_MAX_RESULTS
+    # Роутер может выбрать любую из реплик: все запросы идут в одну базу.
+    using = router.db_for_read(Post)
+    connection = connections[using]
+    if connection.vendor == 'postgresql':
+        return _postgres_ranked_ids(using, words, published_only, limit)
+    if fts_available(connection):
+        try:
+            return _sqlite_ranked_ids(
+                connection, words, published_only, limit
+            )
+        except DatabaseError:
+            logger.exception(
+                'Поиск по %s не удался, используется icontains', FTS_TABLE
+            )
+            # Таблицу могли удалить: при следующем поиске проверить заново.
+            _fts_databases.discard(connection.settings_dict['NAME'])
+    return _fallback_ranked_ids(using, words, published_only, limit)
+
+
+def filter_posts(posts, query):
+    """Публикации из ``posts``, подходящие под запрос, без ранжирования.
+
+    В отличие от ``ranked_post_ids`` не ограничивает число результатов и
+    не меняет порядок queryset — для админки и других списков со своей
+    сортировкой.
+    """
+    words = search_words(query)
+    if not words:
+        return posts.none()
+    connection = connections[posts.db]
+    if connection.vendor == 'postgresql':
+        vector, search_query = _postgres_search(words)
+        return posts.annotate(search=vector).filter(search=search_query)
+    if fts_available(connection):
+        return posts.filter(pk__in=RawSQL(
+            f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s',
+            [_fts_match_expression(words)]
+        ))
+    return _fallback_filter(posts, words)
@@ -0,0 +1,154 @@
+from django.contrib.auth import get_user_model
+from django.core.signals import request_started
+from django.db.backends.signals import connection_created
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .cache import invalidate_category_cache, invalidate_feed_cache
+from .connections import check_connections, record
+from .instrumentation import install_query_counter
+from .models import Category, Comment, Location, MediaBlob, Post
+from .search import index_post, unindex_post
+from .tasks import update_author_stats
+
+User = get_user_model()
+
+
+@receiver(post_save, sender=Comment)
+def update_post_on_comment_save(sender, instance, created, raw=False,
+                                **kwargs):
+    if raw:
+        return
+    changes = {'updated_at': timezone.now()}
+    if created:
+        changes['comment_count'] = F('comment_count') + 1
+    Post.objects.filter(pk=instance.post_id).update(**changes)
+
+
+@receiver(post_delete, sender=Comment)
+def update_post_on_comment_delete(sender, instance, **kwargs):
+    Post.objects.filter(
+        pk=instance.post_id, comment_count__gt=0
+    ).update(
+        comment_count=F('comment_count') - 1,
+        updated_at=timezone.now()
+    )
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_save, sender=Comment)
+def update_author_stats_on_save(sender, instance, created, raw=False,
+                                **kwargs):
+    if raw or not created:
+        return
+    update_author_stats.delay(instance.author_id)
+
+
+@receiver(post_delete, sender=Post)
+@receiver(post_delete, sender=Comment)
+def update_author_stats_on_delete(sender, instance, **kwargs):
+    update_author_stats.delay(instance.author_id, create=False)
+
+
+# Изменения ниже проходят мимо save() (update(), SET_NULL, удаление), поэтому
+# updated_at затронутых строк обновляется явно: от него зависят ETag и
+# Last-Modified страниц.
+@receiver(post_delete, sender=Post)
+def touch_category_on_post_delete(sender, instance, **kwargs):
+    Category.objects.filter(pk=instance.category_id).update(
+        updated_at=timezone.now()
+    )
+
+
+@receiver(pre_delete, sender=Category)
+def touch_posts_on_category_delete(sender, instance, **kwargs):
+    Post.objects.filter(category=instance).update(updated_at=timezone.now())
+
+
+@receiver(pre_delete, sender=Location)
+def touch_posts_on_location_delete(sender, instance, **kwargs):
+    Post.objects.filter(location=instance).update(updated_at=timezone.now())
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_categories(sender, **kwargs):
+    invalidate_category_cache()
+
+
+@receiver(post_save, sender=Post)
+def update_search_index(sender, instance, raw=False, update_fields=None,
+                        **kwargs):
+    if raw:
+        return
+    if update_fields is None or {'title', 'text'} & set(update_fields):
+        index_post(instance)
+
+
+@receiver(post_delete, sender=Post)
+def remove_from_search_index(sender, instance, **kwargs):
+    unindex_post(instance.pk)
+
+
+@receiver(post_save, sender=Post)
+def count_image_references(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and 'image' not in update_fields:
+        return
+    old = getattr(instance, '_loaded_image', '')
+    new = instance.image.name or ''
+    if new == old:
+        return
+    if new:
+        MediaBlob.objects.acquire(new)
+    if old:
+        MediaBlob.objects.release(old)
+    instance._loaded_image = new
+
+
+@receiver(post_delete, sender=Post)
+def release_image_on_delete(sender, instance, **kwargs):
+    name = getattr(instance, '_loaded_image', None)
+    if name is None:
+        name = instance.image.name
+    if name:
+        MediaBlob.objects.release(name)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+def invalidate_feed(sender, **kwargs):
+    invalidate_feed_cache()
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_feed_on_user_change(sender, instance, created=False,
+                                   update_fields=None, **kwargs):
+    if created:
+        return
+    if update_fields is None or 'username' in update_fields:
+        invalidate_feed_cache()
+        now = timezone.now()
+        Post.objects.filter(author=instance).update(updated_at=now)
+        Post.objects.filter(comments__author=instance).update(updated_at=now)
+
+
+@receiver(connection_created)
+def count_new_connection(sender, connection, **kwargs):
+    record(connection.alias, 'opened')
+    install_query_counter(connection)
+
+
+# Подключается после close_old_connections из django.db, поэтому
+# проверяются только соединения, оставшиеся открытыми с прошлого запроса.
+@receiver(request_started)
+def check_connections_on_request(sender, **kwargs):
+    check_connections()
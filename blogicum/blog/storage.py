@@ -0,0 +1,135 @@
+"""Хранилище фото публикаций с адресацией по содержимому.
+
+Файл сохраняется под именем из SHA-256 его содержимого:
+``post_images/photo.jpg`` → ``post_images/3f/3fa9…c1.jpg``. Хеш
+считается по частям во время записи во временный файл, поэтому большие
+загрузки не читаются в память целиком. Если такой файл уже есть,
+временный удаляется, и публикации ссылаются на один и тот же файл.
+
+Число ссылок на файл хранится в ``MediaBlob``: когда последняя
+публикация удаляется или меняет фото, файл и его уменьшенные копии
+удаляются после коммита транзакции, если файл старше
+``MEDIA_GC_GRACE_SECONDS``. Свежие файлы, а также всё, что прошло мимо
+счётчиков (``update()``, сбои), удаляет команда ``media_gc``.
+"""
+import hashlib
+import os
+import posixpath
+import tempfile
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+from django.utils import timezone
+from django.utils.deconstruct import deconstructible
+
+HASH_PREFIX_LENGTH = 2
+TEMP_PREFIX = '.upload-'
+# Уменьшенные копии: <имя без расширения>.<ширина>w.<расширение>.
+VARIANT_SUFFIX = 'w'
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+        return self._save(name, content)
+
+    def _save(self, name, content):
+        directory, filename = posixpath.split(name)
+        extension = os.path.splitext(filename)[1].lower()
+        full_directory = self.path(directory)
+        os.makedirs(full_directory, exist_ok=True)
+
+        digest = hashlib.sha256()
+        with tempfile.NamedTemporaryFile(
+                dir=full_directory, prefix=TEMP_PREFIX, delete=False) as temp:
+            for chunk in content.chunks():
+                digest.update(chunk)
+                temp.write(chunk)
+        digest = digest.hexdigest()
+        name = posixpath.join(
+            directory, digest[:HASH_PREFIX_LENGTH], digest + extension
+        )
+        full_path = self.path(name)
+        if os.path.exists(full_path):
+            os.remove(temp.name)
+            # Ссылка на файл появится только после сохранения публикации:
+            # до тех пор media_gc и delete_blob не тронут свежий файл.
+            os.utime(full_path)
+            return name
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+        if self.file_permissions_mode is not None:
+            os.chmod(temp.name, self.file_permissions_mode)
+        # Одинаковое содержимое могли записать параллельно: замена файла
+        # тем же содержимым безопасна.
+        os.replace(temp.name, full_path)
+        return name
+
+    def save_variant(self, name, content):
+        """Сохраняет уменьшенную копию под именем ``name`` без хеширования.
+
+        Имя копии выводится из имени оригинала, прежняя копия заменяется.
+        """
+        if self.exists(name):
+            self.delete(name)
+        return super()._save(name, content)
+
+
+post_image_storage = ContentAddressedStorage()
+
+
+def variant_root(filename):
+    """Имя оригинала без расширения для файла или его уменьшенной копии."""
+    root, _ = os.path.splitext(filename)
+    base, _, width = root.rpartition('.')
+    if base and width.endswith(VARIANT_SUFFIX) and width[:-1].isdigit():
+        return base
+    return root
+
+
+def is_variant(filename):
+    return variant_root(filename) != os.path.splitext(filename)[0]
+
+
+def blob_files(storage, name):
+    """Файл ``name`` и его уменьшенные копии, которые есть в хранилище."""
+    directory, filename = posixpath.split(name)
+    root = variant_root(filename)
+    _, files = storage.listdir(directory)
+    related = [file for file in files if variant_root(file) == root]
+    if any(file != filename and not is_variant(file) for file in related):
+        # То же содержимое загружено с другим расширением, и копии у них
+        # общие.
+        return [name]
+    return [posixpath.join(directory, file) for file in related]
+
+
+def recently_modified(storage, name, grace=None):
+    """Файл моложе ``grace`` секунд (по умолчанию MEDIA_GC_GRACE_SECONDS)."""
+    if grace is None:
+        grace = settings.MEDIA_GC_GRACE_SECONDS
+    cutoff = timezone.now() - timedelta(seconds=grace)
+    return storage.get_modified_time(name) > cutoff
+
+
+def delete_blob(name, storage=post_image_storage):
+    from .models import MediaBlob
+
+    # Файл мог снова понадобиться новой публикации: она уже взяла ссылку
+    # или только что загрузила то же содержимое и ещё не сохранена.
+    # Свежий файл остаётся до media_gc.
+    if MediaBlob.objects.filter(name=name).exists():
+        return
+    try:
+        if recently_modified(storage, name):
+            return
+        files = blob_files(storage, name)
+    except FileNotFoundError:
+        return
+    for file in files:
+        storage.delete(file)
@@ -0,0 +1,25 @@
+from django.core.mail import send_mail
+
+from tasks.queue import task
+
+from .models import AuthorStats
+from .thumbnails import make_post_thumbnails
+
+
+@task
+def make_thumbnails(post_id, image_name):
+    make_post_thumbnails(post_id, image_name)
+
+
+@task
+def update_author_stats(user_id, create=True):
+    AuthorStats.objects.refresh(user_id, create=create)
+
+
+@task
+def send_email(subject, message, from_email, recipient_list,
+               html_message=None):
+    send_mail(
+        subject, message, from_email, recipient_list,
+        html_message=html_message
+    )
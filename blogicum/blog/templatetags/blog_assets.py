@@ -0,0 +1,49 @@
+from django import template
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils.html import format_html
+from django.utils.safestring import mark_safe
+
+register = template.Library()
+
+_stylesheets = {}
+
+
+@receiver(setting_changed)
+def clear_stylesheets(setting, **kwargs):
+    if setting.startswith('STATIC') or setting == 'CRITICAL_CSS':
+        _stylesheets.clear()
+
+
+def build_stylesheet(name):
+    href = staticfiles_storage.url(name)
+    critical = settings.CRITICAL_CSS.get(name)
+    if critical is None:
+        return format_html('<link rel="stylesheet" href="{}">', href)
+    with open(finders.find(critical), encoding='utf-8') as file:
+        inline = file.read().replace('</', '<\\/')
+    # Критические стили применяются сразу, а полная таблица грузится,
+    # не блокируя отрисовку страницы.
+    return format_html(
+        '<style>{}</style>'
+        '<link rel="preload" href="{}" as="style"'
+        ' onload="this.onload=null;this.rel=\'stylesheet\'">'
+        '<noscript><link rel="stylesheet" href="{}"></noscript>',
+        mark_safe(inline), href, href,
+    )
+
+
+@register.simple_tag
+def stylesheet(name):
+    """<link> на таблицу стилей из статики, собранный один раз на процесс.
+
+    Для таблиц из ``CRITICAL_CSS`` встраивает критические стили и
+    загружает полную таблицу асинхронно.
+    """
+    link = _stylesheets.get(name)
+    if link is None:
+        link = _stylesheets[name] = build_stylesheet(name)
+    return link
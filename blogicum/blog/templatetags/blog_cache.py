@@ -0,0 +1,16 @@
+from django import template
+from django.utils.safestring import mark_safe
+
+from blog.cache import POST_CARD_TEMPLATE, render_post_card
+
+register = template.Library()
+
+
+@register.simple_tag(takes_context=True)
+def post_card(context, post):
+    def render():
+        card = context.template.engine.get_template(POST_CARD_TEMPLATE)
+        with context.push(post=post):
+            return card.render(context)
+
+    return mark_safe(render_post_card(post, render))
@@ -0,0 +1,37 @@
+from django import template
+from django.utils.html import format_html
+
+from blog.thumbnails import THUMBNAIL_FORMATS, variant_name
+
+register = template.Library()
+
+
+def _srcset(image, widths, ext):
+    storage = image.storage
+    return ', '.join(
+        f'{storage.url(variant_name(image.name, width, ext))} {width}w'
+        for width in widths
+    )
+
+
+@register.simple_tag
+def post_picture(post, sizes, css_class=''):
+    """<picture> с WebP- и JPEG-копиями фото публикации.
+
+    Пока копии не готовы, выводит обычный <img> с оригиналом.
+    """
+    image = post.image
+    widths = post.image_widths
+    if not widths:
+        return format_html(
+            '<img class="{}" src="{}">', css_class, image.url
+        )
+    (webp, _, webp_type), (jpeg, _, _) = THUMBNAIL_FORMATS
+    fallback = variant_name(image.name, widths[-1], jpeg)
+    return format_html(
+        '<picture><source type="{}" srcset="{}" sizes="{}">'
+        '<img class="{}" src="{}" srcset="{}" sizes="{}"></picture>',
+        webp_type, _srcset(image, widths, webp), sizes,
+        css_class, image.storage.url(fallback),
+        _srcset(image, widths, jpeg), sizes,
+    )
@@ -0,0 +1,81 @@
+"""Уменьшенные копии фото публикаций.
+
+Для каждой ширины из ``THUMBNAIL_WIDTHS`` рядом с оригиналом сохраняются
+копии в WebP и JPEG: ``post_images/photo.jpg`` →
+``post_images/photo.640w.webp`` и ``post_images/photo.640w.jpg``. Готовые
+ширины записываются в ``Post.image_widths``; пока список пуст, шаблоны
+выводят оригинал. Копии делает фоновая задача
+``blog.tasks.make_thumbnails``.
+"""
+import logging
+import os
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps
+
+logger = logging.getLogger(__name__)
+
+# Расширение файла, формат Pillow и MIME-тип для <source type>.
+THUMBNAIL_FORMATS = (
+    ('webp', 'WEBP', 'image/webp'),
+    ('jpg', 'JPEG', 'image/jpeg'),
+)
+
+
+def variant_name(name, width, ext):
+    root, _ = os.path.splitext(name)
+    return f'{root}.{width}w.{ext}'
+
+
+def variant_widths(image_width):
+    """Ширины копий для исходной ширины; увеличение не выполняется."""
+    return sorted({
+        min(width, image_width) for width in settings.THUMBNAIL_WIDTHS
+    })
+
+
+def generate_variants(name, storage):
+    """Сохраняет копии фото ``name`` из ``storage`` и возвращает их ширины.
+
+    Копии пишутся в то же хранилище под именами из ``variant_name``.
+    """
+    with storage.open(name) as source:
+        image = Image.open(source)
+        image = ImageOps.exif_transpose(image)
+    widths = variant_widths(image.width)
+    for width in widths:
+        height = max(1, round(image.height * width / image.width))
+        resized = image.resize((width, height), Image.Resampling.LANCZOS)
+        for ext, pil_format, _ in THUMBNAIL_FORMATS:
+            if pil_format == 'JPEG' and resized.mode != 'RGB':
+                frame = resized.convert('RGB')
+            else:
+                frame = resized
+            buffer = BytesIO()
+            frame.save(
+                buffer, pil_format,
+                quality=settings.THUMBNAIL_QUALITY, optimize=True
+            )
+            storage.save_variant(
+                variant_name(name, width, ext),
+                ContentFile(buffer.getvalue())
+            )
+    return widths
+
+
+def make_post_thumbnails(post_id, image_name):
+    from .models import Post
+
+    try:
+        widths = generate_variants(
+            image_name, Post._meta.get_field('image').storage
+        )
+    except (OSError, Image.DecompressionBombError):
+        logger.exception('Не удалось уменьшить фото %s', image_name)
+        return
+    # Фото могли заменить, пока шла обработка: тогда ширины не записываются.
+    Post.objects.filter(pk=post_id, image=image_name).update(
+        image_widths=widths
+    )
@@ -1,15 +1,22 @@
 from django.conf import settings
-from django.conf.urls.static import static
 from django.urls import path
 from . import views
 
 app_name = "blog"
 
+if settings.ASYNC_VIEWS:
+    from .async_views import category_posts, post_detail, post_list
+else:
+    post_list = views.PostListView.as_view()
+    category_posts = views.CategoryListView.as_view()
+    post_detail = views.PostDetailView.as_view()
+
 urlpatterns = [
-    path("", views.PostListView.as_view(), name="index"),
+    path("", post_list, name="index"),
+    path("search/", views.PostSearchView.as_view(), name="search"),
     path(
         "category/<slug:category_slug>/",
-        views.CategoryListView.as_view(),
+        category_posts,
         name="category_posts"),
     path(
         "posts/create/",
@@ -17,7 +24,7 @@ urlpatterns = [
         name="create_post"),
     path(
         "posts/<int:post_id>/",
-        views.PostDetailView.as_view(),
+        post_detail,
         name="post_detail"),
     path(
         "posts/<int:post_id>/edit/",
@@ -49,5 +56,11 @@ urlpatterns = [
         name="profile"
     ),
     path("edit-profile/", views.UserUpdateView.as_view(), name="edit_profile"),
-] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
-
+    path("stats/cache/", views.CacheStatsView.as_view(), name="cache_stats"),
+    path("stats/db/", views.ConnectionStatsView.as_view(), name="db_stats"),
+    path(
+        "stats/requests/",
+        views.RequestStatsView.as_view(),
+        name="request_stats"
+    ),
+]
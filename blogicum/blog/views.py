@@ -1,9 +1,22 @@
+import hashlib
+from calendar import timegm
+
+from django.conf import settings
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
 from django.contrib.auth.models import User
-from django.core.paginator import Paginator
-from django.http import Http404
+from django.core.paginator import InvalidPage, Paginator
+from django.db import transaction
+from django.http import Http404, HttpResponse, JsonResponse
+from django.middleware.csrf import get_token
 from django.shortcuts import get_object_or_404, redirect
 from django.urls import reverse, reverse_lazy
+from django.utils.cache import (
+    get_conditional_response,
+    patch_cache_control,
+    quote_etag,
+)
+from django.utils import timezone
+from django.utils.http import http_date, urlencode
 from django.views.generic import (
     CreateView,
     DeleteView,
@@ -11,39 +24,158 @@ from django.views.generic import (
     FormView,
     ListView,
     UpdateView,
+    View,
 )
 from django.views.generic.detail import SingleObjectMixin
 
+from .cache import (
+    cache_feed_page,
+    feed_cache_enabled,
+    feed_cache_key,
+    get_cached_feed_page,
+    get_category,
+    get_fragment_cache_stats,
+)
+from .connections import get_connection_stats
 from .forms import CommentForm, PostCreateForm
-from .models import Category, Comment, Post
-
-
-class PostListView(ListView):
+from .instrumentation import get_request_stats
+from .models import AuthorStats, Comment, Post
+from .paginators import CursorPaginator
+from .search import ranked_post_ids
+from .tasks import make_thumbnails
+
+
+class FeedPaginationMixin:
+    def uses_cursor_pagination(self):
+        return getattr(settings, "FEED_PAGINATION", "page") == "cursor"
+
+    def get_cursor_page(self, posts):
+        paginator = CursorPaginator(posts, self.paginate_by)
+        try:
+            return paginator, paginator.page(self.request.GET.get("cursor"))
+        except InvalidPage as error:
+            raise Http404(str(error))
+
+    def paginate_queryset(self, queryset, page_size):
+        if not self.uses_cursor_pagination():
+            return super().paginate_queryset(queryset, page_size)
+        paginator, page = self.get_cursor_page(queryset)
+        return paginator, page, page.object_list, page.has_other_pages()
+
+
+class CachedFeedMixin:
+    def get(self, request, *args, **kwargs):
+        if request.user.is_authenticated or not feed_cache_enabled():
+            return super().get(request, *args, **kwargs)
+
+        key = feed_cache_key(request)
+        if key is None:
+            return super().get(request, *args, **kwargs)
+        content = get_cached_feed_page(key)
+        if content is not None:
+            return HttpResponse(content)
+
+        response = super().get(request, *args, **kwargs)
+        response.add_post_render_callback(
+            lambda rendered: cache_feed_page(key, rendered)
+        )
+        return response
+
+
+class ConditionalGetMixin:
+    """ETag и Last-Modified по одному запросу к БД до рендеринга шаблона.
+
+    Last-Modified отдаётся только анонимам: у авторизованных страница
+    зависит от пользователя, поэтому для них используется только ETag,
+    в который входят пользователь и его CSRF-токен.
+    """
+
+    def get_page_state(self):
+        raise NotImplementedError
+
+    def get_validators(self, state):
+        user = self.request.user
+        csrf_token = None
+        if user.is_authenticated:
+            # Формы на странице несут CSRF-токен: после входа или смены
+            # токена закэшированная браузером копия отправит устаревший.
+            get_token(self.request)
+            csrf_token = self.request.META["CSRF_COOKIE"]
+        fingerprint = repr((
+            self.request.resolver_match.view_name,
+            sorted(self.kwargs.items()),
+            sorted(self.request.GET.items()),
+            user.pk, user.get_username(), csrf_token,
+            sorted(state.items()),
+        ))
+        etag = quote_etag(hashlib.md5(fingerprint.encode()).hexdigest())
+        if user.is_authenticated:
+            return etag, None
+        timestamps = [
+            value for value in state.values()
+            if hasattr(value, "utctimetuple")
+        ]
+        return etag, timegm(max(timestamps).utctimetuple())
+
+    def get(self, request, *args, **kwargs):
+        state = self.get_page_state()
+        if state is None:
+            return super().get(request, *args, **kwargs)
+
+        etag, last_modified = self.get_validators(state)
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            response = super().get(request, *args, **kwargs)
+        if response.status_code in (200, 304):
+            response["ETag"] = etag
+            if last_modified is not None:
+                response["Last-Modified"] = http_date(last_modified)
+            patch_cache_control(
+                response, no_cache=True,
+                private=request.user.is_authenticated
+            )
+        return response
+
+
+class FeedConditionalGetMixin(ConditionalGetMixin):
+    def get_page_state(self):
+        return Post.objects.feed_state()
+
+
+class PostListView(FeedConditionalGetMixin, CachedFeedMixin,
+                   FeedPaginationMixin, ListView):
     model = Post
     template_name = "blog/index.html"
+    replica_reads = True
+    anonymous_without_session = True
     context_object_name = "post_list"
     paginate_by = 10
     ordering = "-pub_date"
 
     def get_queryset(self):
-        return Post.published(False).order_by(*Post._meta.ordering)
+        return Post.feed()
 
 
-class CategoryListView(ListView):
+class CategoryListView(FeedConditionalGetMixin, CachedFeedMixin,
+                       FeedPaginationMixin, ListView):
     model = Post
     template_name = "blog/category.html"
+    replica_reads = True
+    anonymous_without_session = True
     context_object_name = "posts"
     paginate_by = 10
     ordering = "-pub_date"
 
     def dispatch(self, request, *args, **kwargs):
-        self.category = get_object_or_404(Category, slug=kwargs["category_slug"])
-        if not self.category.is_published:
+        self.category = get_category(kwargs["category_slug"])
+        if self.category is None or not self.category.is_published:
             raise Http404("Категория не найдена или была снята с публикации.")
         return super().dispatch(request, *args, **kwargs)
 
     def get_queryset(self):
-        return Post.published(False).order_by(*Post._meta.ordering)
+        return Post.feed().filter(category=self.category)
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -51,9 +183,45 @@ class CategoryListView(ListView):
         return context
 
 
-class PostDetailView(DetailView):
+class PostSearchView(ListView):
+    model = Post
+    template_name = "blog/search.html"
+    replica_reads = True
+    context_object_name = "posts"
+    paginate_by = 10
+
+    def get_search_query(self):
+        return self.request.GET.get("q", "").strip()
+
+    def get_queryset(self):
+        return ranked_post_ids(self.get_search_query())
+
+    def paginate_queryset(self, queryset, page_size):
+        paginator, page, page_ids, is_paginated = super().paginate_queryset(
+            queryset, page_size
+        )
+        posts = Post.feed().in_bulk(page_ids)
+        page.object_list = [posts[pk] for pk in page_ids if pk in posts]
+        return paginator, page, page.object_list, is_paginated
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        query = self.get_search_query()
+        context["query"] = query
+        context["page_query"] = urlencode({"q": query}) + "&"
+        return context
+
+
+class PostDetailView(ConditionalGetMixin, DetailView):
     model = Post
     template_name = "blog/detail.html"
+    replica_reads = True
+
+    def get_page_state(self):
+        state = Post.objects.detail_state(self.kwargs["post_id"])
+        if state is not None:
+            state["is_visible"] = state.pop("pub_date") <= timezone.now()
+        return state
 
     def get_object(self, queryset=None):
         post = get_object_or_404(Post, id=self.kwargs['post_id'])
@@ -63,49 +231,70 @@ class PostDetailView(DetailView):
         if not post.is_published and not is_author:
             raise Http404("Публикация не найдена.")
 
-        if post.is_published:
-            return post
-
-        return get_object_or_404(Post.published(True), id=self.kwargs['post_id'])
+        return post
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context["form"] = CommentForm()
         context["comments"] = self.object.comments.select_related("author")
         context["post"] = self.object
-        context["comment_count"] = self.object.comments.count()
+        context["comment_count"] = self.object.comment_count
         return context
 
 
-class UserDetailView(DetailView):
+class UserDetailView(FeedPaginationMixin, DetailView):
     model = User
     template_name = "blog/profile.html"
+    replica_reads = True
     context_object_name = "profile"
     paginate_by = 10
     ordering = "-pub_date"
 
     def get_object(self, queryset=None):
         username = self.kwargs.get("username")
-        return get_object_or_404(User, username=username)
+        return get_object_or_404(
+            User.objects.select_related("blog_stats"), username=username
+        )
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        user = self.get_object()
-
-        if self.request.user == user:
-            posts = Post.published(True) \
-                .filter(author=user).order_by(*Post._meta.ordering)
+        user = self.object
+        is_owner = self.request.user == user
+        posts = Post.feed(is_for_author=is_owner).filter(author=user)
+
+        # AuthorStats учитывает снятые и отложенные публикации и комментарии
+        # к ним, поэтому целиком статистика показывается только владельцу,
+        # а остальным — число видимых публикаций, если оно известно.
+        stats = None
+        post_count = None
+        if is_owner:
+            stats = getattr(user, "blog_stats", None) or AuthorStats(user=user)
+            post_count = stats.post_count
+        context["stats"] = stats
+        if self.uses_cursor_pagination():
+            context["page_obj"] = self.get_cursor_page(posts)[1]
         else:
-            posts = Post.published(False) \
-                .order_by(*Post._meta.ordering)
-
-        paginator = Paginator(posts, self.paginate_by)
-        page_number = self.request.GET.get("page")
-        context["page_obj"] = paginator.get_page(page_number)
+            paginator = Paginator(posts, self.paginate_by)
+            page_number = self.request.GET.get("page")
+            context["page_obj"] = paginator.get_page(page_number)
+            if not is_owner:
+                post_count = paginator.count
+        context["post_count"] = post_count
         return context
 
 
-class PostCreateView(LoginRequiredMixin, CreateView):
+class PostThumbnailMixin:
+    def form_valid(self, form):
+        image_changed = "image" in form.changed_data
+        if image_changed:
+            form.instance.image_widths = []
+        response = super().form_valid(form)
+        if image_changed and self.object.image:
+            make_thumbnails.delay(self.object.pk, self.object.image.name)
+        return response
+
+
+class PostCreateView(LoginRequiredMixin, PostThumbnailMixin, CreateView):
     form_class = PostCreateForm
     template_name = "blog/create.html"
     login_url = reverse_lazy("login")
@@ -121,35 +310,41 @@ class PostCreateView(LoginRequiredMixin, CreateView):
         )
 
 
-class PostUpdateView(LoginRequiredMixin, UserPassesTestMixin, UpdateView):
+class AuthorRequiredMixin(LoginRequiredMixin, UserPassesTestMixin):
+    def get_object(self, queryset=None):
+        if not hasattr(self, "_object"):
+            self._object = super().get_object(queryset)
+        return self._object
+
+    def test_func(self):
+        return self.get_object().author_id == self.request.user.pk
+
+
+class PostUpdateView(AuthorRequiredMixin, PostThumbnailMixin, UpdateView):
     model = Post
     form_class = PostCreateForm
     template_name = "blog/create.html"
-
-    def test_func(self):
-        return self.get_object().author == self.request.user
+    pk_url_kwarg = "post_id"
 
     def handle_no_permission(self):
         return redirect(
-            reverse("blog:post_detail", kwargs={"post_id": self.get_object().id})
+            "blog:post_detail", post_id=self.kwargs["post_id"]
         )
 
     def get_success_url(self):
         return reverse_lazy("blog:post_detail", kwargs={"post_id": self.object.id})
 
 
-class PostDeleteView(LoginRequiredMixin, UserPassesTestMixin, DeleteView):
+class PostDeleteView(AuthorRequiredMixin, DeleteView):
     model = Post
     template_name = "blog/create.html"
     success_url = reverse_lazy("blog:index")
-
-    def test_func(self):
-        return self.get_object().author == self.request.user
+    pk_url_kwarg = "post_id"
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context["form"] = PostCreateForm(
-            instance=self.get_object()
+            instance=self.object
         )
         return context
 
@@ -185,50 +380,67 @@ class CommentCreateView(LoginRequiredMixin, SingleObjectMixin, FormView):
         comment = form.save(commit=False)
         comment.author = self.request.user
         comment.post = self.object
-        comment.save()
+        with transaction.atomic():
+            comment.save()
         return super().form_valid(form)
 
     def get_success_url(self):
         return reverse("blog:post_detail", kwargs={"post_id": self.object.pk})
 
 
-class CommentUpdateView(LoginRequiredMixin, UserPassesTestMixin, UpdateView):
+class CommentUpdateView(AuthorRequiredMixin, UpdateView):
     model = Comment
     form_class = CommentForm
     template_name = "blog/comment.html"
-
-    def test_func(self):
-        return self.get_object().author == self.request.user
+    pk_url_kwarg = "comment_id"
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context["comment"] = self.get_object()
+        context["comment"] = self.object
         return context
 
-    def get_object(self, queryset=None):
-        return get_object_or_404(Comment, id=self.kwargs['comment_id'])
-
     def get_success_url(self):
-        return reverse("blog:post_detail", kwargs={"post_id": self.object.post.pk})
+        return reverse(
+            "blog:post_detail", kwargs={"post_id": self.object.post_id}
+        )
 
 
-class CommentDeleteView(LoginRequiredMixin, UserPassesTestMixin, DeleteView):
+class CommentDeleteView(AuthorRequiredMixin, DeleteView):
     model = Comment
     template_name = 'blog/comment.html'
-
-    def test_func(self):
-        return self.get_object().author == self.request.user
+    pk_url_kwarg = 'comment_id'
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['comment'] = self.get_object()
+        context['comment'] = self.object
         return context
 
-    def get_object(self, queryset=None):
-        return get_object_or_404(Comment, id=self.kwargs['comment_id'])
+    @transaction.atomic
+    def delete(self, request, *args, **kwargs):
+        return super().delete(request, *args, **kwargs)
 
     def get_success_url(self):
         return reverse_lazy(
             'blog:post_detail',
-            kwargs={'post_id': self.object.post.pk}
+            kwargs={'post_id': self.object.post_id}
         )
+
+
+class StaffRequiredMixin(LoginRequiredMixin, UserPassesTestMixin):
+    def test_func(self):
+        return self.request.user.is_staff
+
+
+class CacheStatsView(StaffRequiredMixin, View):
+    def get(self, request, *args, **kwargs):
+        return JsonResponse({"post_card": get_fragment_cache_stats()})
+
+
+class ConnectionStatsView(StaffRequiredMixin, View):
+    def get(self, request, *args, **kwargs):
+        return JsonResponse(get_connection_stats())
+
+
+class RequestStatsView(StaffRequiredMixin, View):
+    def get(self, request, *args, **kwargs):
+        return JsonResponse(get_request_stats())
@@ -0,0 +1,43 @@
+import logging
+from pathlib import Path
+
+from django.conf import settings
+from django.template import engines
+from django.template.backends.django import DjangoTemplates
+
+logger = logging.getLogger(__name__)
+
+
+def iter_project_templates(engine):
+    for directory in engine.engine.dirs:
+        directory = Path(directory)
+        for path in sorted(directory.rglob('*.html')):
+            yield path.relative_to(directory).as_posix()
+
+
+def warm_templates():
+    """Компилирует шаблоны из DIRS, чтобы они попали в cached.Loader."""
+    warmed = []
+    for engine in engines.all():
+        if not isinstance(engine, DjangoTemplates):
+            continue
+        for name in iter_project_templates(engine):
+            try:
+                engine.get_template(name)
+            except Exception:
+                # Ошибка в одном шаблоне не должна мешать запуску воркера:
+                # она повторится и будет видна на первом запросе к нему.
+                logger.exception('Не удалось скомпилировать шаблон %s', name)
+            else:
+                warmed.append(name)
+    return warmed
+
+
+def warm_templates_on_startup():
+    """Прогрев из точек входа WSGI/ASGI, если включён в настройках.
+
+    Не вызывается из ``AppConfig.ready()``, чтобы команды ``manage.py``,
+    миграции и тесты не компилировали все шаблоны.
+    """
+    if getattr(settings, 'WARM_TEMPLATES_ON_STARTUP', False):
+        warm_templates()
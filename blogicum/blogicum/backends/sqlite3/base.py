@@ -0,0 +1,24 @@
+"""SQLite с настройками ``SQLITE_PRAGMAS`` и транзакциями BEGIN IMMEDIATE.
+
+Прагмы применяются к каждому новому соединению. Транзакция SQLite по
+умолчанию начинается как DEFERRED и берёт блокировку на запись только
+при первой записи. Если её в этот момент держит другое соединение,
+SQLite не ждёт ``timeout``: данные, прочитанные в транзакции, могли
+устареть, поэтому сразу возвращается «database is locked». С
+``BEGIN IMMEDIATE`` блокировка берётся в начале ``atomic()``, где
+ожидание работает. Запросы вне ``atomic()`` выполняются в режиме
+autocommit, и их это не касается.
+"""
+from django.conf import settings
+from django.db.backends.sqlite3 import base
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    def get_new_connection(self, conn_params):
+        connection = super().get_new_connection(conn_params)
+        for name, value in settings.SQLITE_PRAGMAS.items():
+            connection.execute(f'PRAGMA {name} = {value}')
+        return connection
+
+    def _start_transaction_under_autocommit(self):
+        self.cursor().execute('BEGIN IMMEDIATE')
@@ -0,0 +1,170 @@
+"""Раздача загруженных файлов (фото публикаций) в продакшене.
+
+Режим задаёт ``MEDIA_SERVING``:
+
+* ``'django'`` — файл отдаёт сам Django, с поддержкой ``Range`` и
+  ``If-Range``. Тело ответа — файл, открытый на начале диапазона и
+  ограниченный его длиной; WSGI-сервер с ``wsgi.file_wrapper`` (gunicorn,
+  uWSGI) передаёт его через ``os.sendfile``, не копируя в память процесса;
+* ``'x-accel-redirect'`` — Django только проверяет путь и условные
+  заголовки, а файл из внутреннего location ``MEDIA_ACCEL_PREFIX`` отдаёт
+  nginx;
+* ``'x-sendfile'`` — то же для Apache (mod_xsendfile) и lighttpd.
+
+Наружу отдаются только изображения. Скрытые файлы и каталоги (с точкой
+в начале имени), в том числе недописанные загрузки ``.upload-*`` из
+``blog.storage``, считаются несуществующими.
+"""
+import mimetypes
+import os
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, Http404, HttpResponse
+from django.urls import re_path
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_http_date_safe
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+# До Python 3.11 WebP-копий фото нет во встроенной таблице типов.
+mimetypes.add_type('image/webp', '.webp')
+
+
+class RangeNotSatisfiable(Exception):
+    pass
+
+
+class RangeFile:
+    """Файл, читаемый с ``start`` и не дальше ``length`` байт."""
+
+    def __init__(self, path, start, length):
+        self.name = path
+        self.file = open(path, 'rb')
+        self.file.seek(start)
+        self.remaining = length
+
+    def read(self, size=-1):
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def fileno(self):
+        return self.file.fileno()
+
+    def tell(self):
+        return self.file.tell()
+
+    def close(self):
+        self.file.close()
+
+
+def parse_range(header, size):
+    """Возвращает (начало, конец включительно) или None для всего файла.
+
+    Поддерживается один диапазон; на несколько сразу отдаётся весь файл,
+    что допускает RFC 7233.
+    """
+    match = RANGE_RE.match(header.replace(' ', ''))
+    if match is None:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        start, end = max(size - int(last), 0), size - 1
+    else:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+    if start > end or start >= size:
+        raise RangeNotSatisfiable
+    return start, end
+
+
+def range_applies(request, etag, mtime):
+    if_range = request.META.get('HTTP_IF_RANGE')
+    if not if_range:
+        return True
+    if if_range.startswith(('"', 'W/')):
+        return if_range == etag
+    date = parse_http_date_safe(if_range)
+    return date is not None and int(mtime) <= date
+
+
+def file_response(request, path, size, content_type, etag, mtime):
+    byte_range = None
+    range_header = request.META.get('HTTP_RANGE')
+    if range_header and range_applies(request, etag, mtime):
+        try:
+            byte_range = parse_range(range_header, size)
+        except RangeNotSatisfiable:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{size}'
+            return response
+    start, end = byte_range or (0, size - 1)
+    length = end - start + 1
+    if request.method == 'HEAD':
+        response = HttpResponse(content_type=content_type)
+    else:
+        response = FileResponse(
+            RangeFile(path, start, length), content_type=content_type
+        )
+        del response['Content-Disposition']
+    if byte_range:
+        response.status_code = 206
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+    response['Content-Length'] = length
+    return response
+
+
+def is_public(path):
+    if any(part.startswith('.') for part in path.split('/')):
+        return False
+    content_type = mimetypes.guess_type(path)[0]
+    return content_type is not None and content_type.startswith('image/')
+
+
+def serve_media(request, path):
+    if not is_public(path):
+        raise Http404
+    try:
+        full_path = safe_join(settings.MEDIA_ROOT, path)
+    except SuspiciousFileOperation:
+        raise Http404
+    if not os.path.isfile(full_path):
+        raise Http404
+    stat = os.stat(full_path)
+    etag = f'"{int(stat.st_mtime):x}-{stat.st_size:x}"'
+    response = get_conditional_response(
+        request, etag=etag, last_modified=int(stat.st_mtime)
+    )
+    if response is None:
+        content_type = mimetypes.guess_type(full_path)[0]
+        mode = settings.MEDIA_SERVING
+        if mode == 'x-accel-redirect':
+            response = HttpResponse(content_type=content_type)
+            response['X-Accel-Redirect'] = (
+                settings.MEDIA_ACCEL_PREFIX + quote(path)
+            )
+        elif mode == 'x-sendfile':
+            response = HttpResponse(content_type=content_type)
+            response['X-Sendfile'] = full_path
+        else:
+            response = file_response(
+                request, full_path, stat.st_size, content_type,
+                etag, stat.st_mtime
+            )
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(stat.st_mtime)
+    response['Accept-Ranges'] = 'bytes'
+    response['Cache-Control'] = f'public, max-age={settings.MEDIA_MAX_AGE}'
+    return response
+
+
+def media_urlpatterns():
+    prefix = re.escape(settings.MEDIA_URL.lstrip('/'))
+    return [re_path(rf'^{prefix}(?P<path>.+)$', serve_media)]
@@ -0,0 +1,74 @@
+"""Страницы ленты для анонимов без обращения к хранилищу сессий.
+
+Запрос без cookie сессии Django и так обслуживает, не читая хранилище.
+Но у анонима может остаться cookie непустой анонимной сессии, и тогда
+каждая страница, проверяющая ``request.user``, загружает её из кеша или
+из ``django_session``. После первой такой загрузки клиент получает cookie
+``ANONYMOUS_COOKIE``, и представления с атрибутом
+``anonymous_without_session = True`` на GET- и HEAD-запросах с этой
+cookie работают с пустой сессией, не трогая хранилище. Cookie удаляется,
+как только в сессии появляется пользователь или сама сессия пропадает,
+а подделать её можно лишь во вред себе: с ней видна анонимная страница.
+"""
+import asyncio
+from importlib import import_module
+
+from django.conf import settings
+from django.contrib.auth import SESSION_KEY
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+
+ANONYMOUS_COOKIE = 'anonymous_session'
+SAFE_METHODS = ('GET', 'HEAD')
+
+
+def view_skips_session(view_func):
+    view_class = getattr(view_func, 'view_class', None)
+    return getattr(view_class or view_func, 'anonymous_without_session', False)
+
+
+class AnonymousSessionMiddleware(MiddlewareMixin):
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        self.SessionStore = import_module(settings.SESSION_ENGINE).SessionStore
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self):
+            return self.__acall__(request)
+        return self.restore_session(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        return self.restore_session(request, await self.get_response(request))
+
+    def restore_session(self, request, response):
+        stored_session = getattr(request, '_stored_session', None)
+        if stored_session is not None:
+            # SessionMiddleware должна увидеть настоящую, нетронутую сессию:
+            # иначе она удалила бы cookie сессии как опустевшей.
+            request.session = stored_session
+            patch_vary_headers(response, ('Cookie',))
+        elif getattr(request, 'session', None) is not None:
+            self.update_marker(request, response)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if (settings.SESSION_SKIP_ANONYMOUS
+                and request.method in SAFE_METHODS
+                and request.COOKIES.get(ANONYMOUS_COOKIE)
+                and view_skips_session(view_func)):
+            request._stored_session = request.session
+            request.session = self.SessionStore()
+
+    def update_marker(self, request, response):
+        session = request.session
+        if not session.accessed:
+            return
+        anonymous = not session.is_empty() and SESSION_KEY not in session
+        marked = bool(request.COOKIES.get(ANONYMOUS_COOKIE))
+        if anonymous and not marked:
+            response.set_cookie(
+                ANONYMOUS_COOKIE, '1', max_age=session.get_expiry_age(),
+                httponly=True, samesite='Lax'
+            )
+        elif not anonymous and marked:
+            response.delete_cookie(ANONYMOUS_COOKIE, samesite='Lax')
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/3.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -41,6 +42,7 @@ STATICFILES_DIRS = [
 INSTALLED_APPS = [
     'blog.apps.BlogConfig',
     'pages.apps.PagesConfig',
+    'tasks.apps.TasksConfig',
     'django.contrib.admin',
     'django.contrib.auth',
     'django.contrib.contenttypes',
@@ -51,11 +53,15 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'blog.instrumentation.QueryTimingMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'blogicum.staticfiles.StaticFilesMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'blogicum.replicas.ReplicaRoutingMiddleware',
+    'blogicum.sessions.AnonymousSessionMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -67,8 +73,13 @@ TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [TEMPLATES_DIR],
-        'APP_DIRS': True,
         'OPTIONS': {
+            'loaders': [
+                ('django.template.loaders.cached.Loader', [
+                    'django.template.loaders.filesystem.Loader',
+                    'django.template.loaders.app_directories.Loader',
+                ]),
+            ],
             'context_processors': [
                 'django.template.context_processors.debug',
                 'django.template.context_processors.request',
@@ -79,21 +90,157 @@ TEMPLATES = [
     },
 ]
 
+# Compile every template under TEMPLATES_DIR when a WSGI/ASGI worker starts,
+# so its first request skips template parsing. manage.py commands and tests
+# don't warm; use the warm_templates command there.
+WARM_TEMPLATES_ON_STARTUP = True
+
 WSGI_APPLICATION = 'blogicum.wsgi.application'
 CSRF_FAILURE_VIEW = 'pages.views.csrf_failure'
 
 # Database
 # https://docs.djangoproject.com/en/3.2/ref/settings/#databases
 
+# Connections are kept open for CONN_MAX_AGE seconds and reused by later
+# requests of the same worker thread; with DB_HEALTH_CHECKS a reused
+# connection is pinged before the request and replaced if it is broken.
+CONN_MAX_AGE = 60
+DB_HEALTH_CHECKS = True
+
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
+        'ENGINE': 'blogicum.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'CONN_MAX_AGE': CONN_MAX_AGE,
+    }
+}
+
+# Read-only views read from these aliases; writes always go to 'default'.
+# Locally a replica can be another SQLite file refreshed by
+# `manage.py replicate_db`, e.g. BLOGICUM_REPLICA_DB=db.replica.sqlite3.
+DATABASE_REPLICAS = []
+if os.environ.get('BLOGICUM_REPLICA_DB'):
+    DATABASES['replica'] = {
+        'ENGINE': 'blogicum.backends.sqlite3',
+        'NAME': BASE_DIR / os.environ['BLOGICUM_REPLICA_DB'],
+        'CONN_MAX_AGE': CONN_MAX_AGE,
+        'TEST': {'MIRROR': 'default'},
     }
+    DATABASE_REPLICAS.append('replica')
+DATABASE_ROUTERS = ['blogicum.replicas.PrimaryReplicaRouter']
+# After a write the client reads from 'default' for this many seconds.
+REPLICA_PIN_SECONDS = 10
+
+# Applied to every new SQLite connection by blogicum.backends.sqlite3. WAL
+# lets readers run while a comment is being written, and NORMAL sync is safe
+# in WAL mode (a power loss can only drop the last transactions). Writers
+# wait for the lock up to OPTIONS['timeout'] (5 s by default); the backend
+# starts atomic() blocks with BEGIN IMMEDIATE so that the wait applies.
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'mmap_size': 256 * 1024 * 1024,
+    'cache_size': -64 * 1024,
+    'temp_store': 'MEMORY',
 }
 
+# Per-request instrumentation: Server-Timing headers with DB, template and
+# total time, and a warning in the log when a view runs more queries than
+# its budget (QUERY_BUDGETS by view name, QUERY_BUDGET otherwise).
+SERVER_TIMING = True
+QUERY_BUDGET = 20
+QUERY_BUDGETS = {
+    'blog:index': 6,
+    'blog:category_posts': 7,
+    'blog:post_detail': 9,
+    'blog:profile': 6,
+    'blog:search': 5,
+}
+
+# Feed pagination: 'page' (numbered pages) or 'cursor' (keyset on
+# pub_date and id, no COUNT(*)/OFFSET on deep pages).
+FEED_PAGINATION = 'page'
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'sessions': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'sessions',
+    },
+}
+
+# With cached_db, sessions are read from the cache and written through to
+# both the cache and django_session, so a logged-in request normally costs
+# no query. The cache must be shared by all worker processes: with a
+# per-process cache a logout or password change handled by one worker
+# would leave the session valid in the others. So cached_db is only used
+# when BLOGICUM_SESSION_CACHE names a memcached server (needs pymemcache);
+# otherwise sessions stay in django_session.
+SESSION_ENGINE = 'django.contrib.sessions.backends.db'
+SESSION_CACHE_ALIAS = 'sessions'
+if os.environ.get('BLOGICUM_SESSION_CACHE'):
+    CACHES['sessions'] = {
+        'BACKEND': 'django.core.cache.backends.memcached.PyMemcacheCache',
+        'LOCATION': os.environ['BLOGICUM_SESSION_CACHE'],
+    }
+    SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+SESSION_SAVE_EVERY_REQUEST = False
+# Anonymous feed pages skip session storage once the visitor is known to
+# be anonymous (see blogicum/sessions.py).
+SESSION_SKIP_ANONYMOUS = True
+
+# Rendered feed pages for anonymous visitors are kept this many seconds
+# (0 disables the cache).
+FEED_CACHE_TIMEOUT = 60 * 5
+
+# Category lookups by slug; entries are dropped on any category change.
+CATEGORY_CACHE_TIMEOUT = 60 * 60
+
+# Rendered post cards are keyed by a content fingerprint, so they only need
+# to expire to free memory.
+POST_CARD_CACHE_TIMEOUT = 60 * 60 * 24
+
+# Full-text search: how many ranked results are kept, and after how many
+# days a post's relevance is halved.
+SEARCH_MAX_RESULTS = 500
+SEARCH_RECENCY_HALF_LIFE_DAYS = 30
+
 MEDIA_ROOT = BASE_DIR / 'media'
 MEDIA_URL = '/media/'
+# How uploaded files are served (see blogicum/media.py): 'django' streams
+# them with Range support, 'x-accel-redirect' hands them to nginx through
+# the internal location MEDIA_ACCEL_PREFIX, 'x-sendfile' to Apache.
+MEDIA_SERVING = 'django'
+MEDIA_ACCEL_PREFIX = '/protected-media/'
+MEDIA_MAX_AGE = 60 * 60 * 24
+# Post photos are stored once per content (blog/storage.py); `manage.py
+# media_gc` removes unreferenced files older than this many seconds.
+MEDIA_GC_GRACE_SECONDS = 60 * 60
+
+# Async variants of the feed and post detail views, enabled by asgi.py.
+# Django 3.2 has no async ORM, so they run the sync views in a dedicated
+# pool of ASYNC_VIEW_THREADS threads.
+ASYNC_VIEWS = os.environ.get('BLOGICUM_ASYNC_VIEWS') == '1'
+ASYNC_VIEW_THREADS = 16
+
+# Resized WebP/JPEG copies of post photos, made by a background task after
+# the post is saved.
+THUMBNAIL_WIDTHS = (320, 640, 1280)
+THUMBNAIL_QUALITY = 80
+
+# Background tasks are stored in the database and executed by
+# `manage.py run_worker`. With TASKS_EAGER they run inline when enqueued.
+TASKS_EAGER = False
+TASKS_WORKERS = 4
+TASKS_MAX_ATTEMPTS = 3
+# Seconds before the first retry; doubled after every failed attempt.
+TASKS_RETRY_DELAY = 30
+TASKS_POLL_INTERVAL = 1
+# Tasks left running this long (a killed worker) are queued again.
+TASKS_LOCK_TIMEOUT = 60 * 10
+
 LOGIN_REDIRECT_URL = '/'
 
 # Password validation
@@ -133,6 +280,19 @@ USE_TZ = True
 # https://docs.djangoproject.com/en/3.2/howto/static-files/
 
 STATIC_URL = '/static/'
+STATIC_ROOT = BASE_DIR / 'static'
+# collectstatic adds content hashes to file names and writes .gz (and .br,
+# when the brotli package is installed) copies next to them; the files are
+# then served by blogicum.staticfiles.StaticFilesMiddleware.
+STATICFILES_STORAGE = (
+    'blogicum.staticfiles.CompressedManifestStaticFilesStorage'
+)
+# Cache lifetime of static files without a hash in the name.
+STATIC_MAX_AGE = 60
+# Stylesheets rendered by {% stylesheet %} whose critical rules are inlined
+# into the page while the full file loads asynchronously, e.g.
+# {'css/bootstrap.min.css': 'css/critical.css'}.
+CRITICAL_CSS = {}
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/3.2/ref/settings/#default-auto-field
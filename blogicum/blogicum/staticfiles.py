@@ -0,0 +1,170 @@
+"""Статика с хешем в именах, заранее сжатая и отдаваемая самим Django.
+
+``collectstatic`` с ``CompressedManifestStaticFilesStorage`` добавляет к
+именам файлов хеш содержимого и рядом кладёт сжатые копии: ``.gz`` и,
+если установлен пакет ``brotli``, ``.br``. ``StaticFilesMiddleware``
+при старте составляет список файлов ``STATIC_ROOT`` и отдаёт их без
+URL-маршрутизации: сжатую копию по ``Accept-Encoding``, с заголовком
+``immutable`` для имён с хешем. Ответ — ``FileResponse``, который
+WSGI-сервер с ``wsgi.file_wrapper`` передаёт через ``sendfile``, без
+копирования файла в память процесса.
+"""
+import asyncio
+import gzip
+import mimetypes
+import os
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import (
+    ManifestStaticFilesStorage,
+    staticfiles_storage,
+)
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import FileResponse, HttpResponse, HttpResponseNotModified
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+from django.utils.http import http_date
+from django.views.static import was_modified_since
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESS_EXTENSIONS = (
+    '.css', '.js', '.map', '.svg', '.ico', '.txt', '.json', '.xml', '.html',
+)
+# Сжатая копия сохраняется, только если она меньше этой доли оригинала.
+COMPRESS_MAX_RATIO = 0.95
+IMMUTABLE = 'public, max-age=31536000, immutable'
+# Порядок предпочтения при разборе Accept-Encoding.
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+
+def compressors():
+    yield '.gz', lambda data: gzip.compress(data, compresslevel=9, mtime=0)
+    if brotli is not None:
+        yield '.br', lambda data: brotli.compress(data, quality=11)
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    def post_process(self, *args, **kwargs):
+        yield from super().post_process(*args, **kwargs)
+        if kwargs.get('dry_run'):
+            return
+        for name in self.hashed_files.values():
+            for compressed_name in self.compress(name):
+                yield name, compressed_name, True
+
+    def compress(self, name):
+        if not name.endswith(COMPRESS_EXTENSIONS):
+            return
+        with self.open(name) as original:
+            data = original.read()
+        for extension, compress in compressors():
+            compressed = compress(data)
+            if len(compressed) > len(data) * COMPRESS_MAX_RATIO:
+                continue
+            path = self.path(name + extension)
+            with open(path, 'wb') as output:
+                output.write(compressed)
+            yield name + extension
+
+    def stored_name(self, name):
+        # Пока collectstatic не запускался, манифеста нет, и ссылки ведут
+        # на исходные файлы (их отдаёт runserver из STATICFILES_DIRS).
+        if not self.hashed_files:
+            return name
+        return super().stored_name(name)
+
+
+class StaticFile:
+    def __init__(self, path, immutable):
+        self.path = path
+        stat = os.stat(path)
+        self.size = stat.st_size
+        self.last_modified = stat.st_mtime
+        self.content_type = (
+            mimetypes.guess_type(path)[0] or 'application/octet-stream'
+        )
+        self.cache_control = IMMUTABLE if immutable else (
+            f'public, max-age={settings.STATIC_MAX_AGE}'
+        )
+        self.encodings = [
+            (encoding, path + extension)
+            for encoding, extension in ENCODINGS
+            if os.path.exists(path + extension)
+        ]
+
+    def negotiate(self, request):
+        header = request.META.get('HTTP_ACCEPT_ENCODING', '')
+        accepted = {value.split(';')[0].strip() for value in header.split(',')}
+        for encoding, path in self.encodings:
+            if encoding in accepted:
+                return encoding, path
+        return None, self.path
+
+    def response(self, request):
+        if not was_modified_since(
+                request.META.get('HTTP_IF_MODIFIED_SINCE'),
+                self.last_modified, self.size):
+            response = HttpResponseNotModified()
+        else:
+            encoding, path = self.negotiate(request)
+            if request.method == 'HEAD':
+                response = HttpResponse(content_type=self.content_type)
+                response['Content-Length'] = os.path.getsize(path)
+            else:
+                response = FileResponse(
+                    open(path, 'rb'), content_type=self.content_type
+                )
+                del response['Content-Disposition']
+            if encoding:
+                response['Content-Encoding'] = encoding
+            response['Last-Modified'] = http_date(self.last_modified)
+        if self.encodings:
+            patch_vary_headers(response, ('Accept-Encoding',))
+        response['Cache-Control'] = self.cache_control
+        return response
+
+
+def find_static_files(root, url):
+    hashed = set(getattr(staticfiles_storage, 'hashed_files', {}).values())
+    compressed = tuple(extension for _, extension in ENCODINGS)
+    files = {}
+    for directory, _, filenames in os.walk(root):
+        for filename in filenames:
+            if filename.endswith(compressed):
+                continue
+            path = os.path.join(directory, filename)
+            name = os.path.relpath(path, root).replace(os.sep, '/')
+            files[url + name] = StaticFile(path, name in hashed)
+    return files
+
+
+class StaticFilesMiddleware(MiddlewareMixin):
+    def __init__(self, get_response):
+        root = settings.STATIC_ROOT
+        if not root or not os.path.isdir(root):
+            raise MiddlewareNotUsed
+        super().__init__(get_response)
+        self.files = find_static_files(root, settings.STATIC_URL)
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self):
+            return self.__acall__(request)
+        static_file = self.find(request)
+        if static_file is None:
+            return self.get_response(request)
+        return static_file.response(request)
+
+    async def __acall__(self, request):
+        static_file = self.find(request)
+        if static_file is None:
+            return await self.get_response(request)
+        return static_file.response(request)
+
+    def find(self, request):
+        if request.method not in ('GET', 'HEAD'):
+            return None
+        return self.files.get(request.path_info)
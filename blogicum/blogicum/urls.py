@@ -1,12 +1,21 @@
 from django.contrib import admin
 from django.urls import include, path, reverse_lazy
 from django.contrib.auth.forms import UserCreationForm
+from django.contrib.auth.views import PasswordResetView
 from django.views.generic.edit import CreateView
 
+from blog.forms import QueuedPasswordResetForm
+from blogicum.media import media_urlpatterns
+
 handler404 = 'pages.views.page_not_found'
 handler500 = 'pages.views.server_error'
 
 urlpatterns = [
+    path(
+        'auth/password_reset/',
+        PasswordResetView.as_view(form_class=QueuedPasswordResetForm),
+        name='password_reset',
+    ),
     path('auth/', include('django.contrib.auth.urls')),
     path('admin/', admin.site.urls),
     path('', include('blog.urls')),
@@ -20,4 +29,4 @@ urlpatterns = [
         ),
         name='registration',
     ),
-]
+] + media_urlpatterns()
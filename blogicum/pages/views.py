@@ -4,10 +4,12 @@ from django.views.generic import TemplateView
 
 class AboutPage(TemplateView):
     template_name = 'pages/about.html'
+    replica_reads = True
 
 
 class RulesPage(TemplateView):
     template_name = 'pages/rules.html'
+    replica_reads = True
 
 
 def page_not_found(request, exception):
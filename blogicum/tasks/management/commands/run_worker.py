@@ -0,0 +1,65 @@
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from tasks.queue import claim_due, execute, requeue_stale
+
+
+class Command(BaseCommand):
+    help = 'Выполняет задачи из очереди фоновых задач.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers', type=int, default=settings.TASKS_WORKERS,
+            help='Сколько задач выполнять одновременно.'
+        )
+        parser.add_argument(
+            '--processes', action='store_true',
+            help='Выполнять задачи в пуле процессов, а не потоков.'
+        )
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Выполнить созревшие задачи и завершиться.'
+        )
+
+    def handle(self, *args, workers, processes=False, once=False,
+               **options):
+        requeued = requeue_stale(settings.TASKS_LOCK_TIMEOUT)
+        if requeued:
+            self.stdout.write(f'Возвращено в очередь задач: {requeued}')
+
+        if processes:
+            # spawn, а не fork: дочерние процессы не должны наследовать
+            # открытые соединения с базой данных.
+            executor = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=django.setup
+            )
+        else:
+            executor = ThreadPoolExecutor(
+                max_workers=workers, thread_name_prefix='tasks'
+            )
+
+        done = failed = 0
+        with executor:
+            while True:
+                task_ids = claim_due(workers * 2)
+                if not task_ids:
+                    if once:
+                        break
+                    time.sleep(settings.TASKS_POLL_INTERVAL)
+                    continue
+                for succeeded in executor.map(execute, task_ids):
+                    if succeeded is None:
+                        continue
+                    done += succeeded
+                    failed += not succeeded
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Выполнено задач: {done}, с ошибкой: {failed}'
+        ))
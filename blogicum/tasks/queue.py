@@ -0,0 +1,111 @@
+"""Очередь фоновых задач в базе данных.
+
+Функция становится задачей после декоратора ``@task``; вызов
+``func.delay(*args, **kwargs)`` добавляет строку в таблицу ``tasks_task``
+в текущей транзакции, а команда ``run_worker`` выбирает и выполняет
+созревшие задачи. Аргументы должны сериализоваться в JSON.
+
+При ``TASKS_EAGER = True`` задача выполняется сразу, в вызывающем коде.
+"""
+import logging
+import traceback
+from datetime import timedelta
+from functools import wraps
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.utils import timezone
+
+from .models import Task
+
+logger = logging.getLogger(__name__)
+
+_registry = {}
+
+
+def task(func):
+    name = f'{func.__module__}.{func.__qualname__}'
+    _registry[name] = func
+
+    @wraps(func)
+    def delay(*args, **kwargs):
+        return enqueue(name, *args, **kwargs)
+
+    func.task_name = name
+    func.delay = delay
+    return func
+
+
+def enqueue(name, *args, **kwargs):
+    if name not in _registry:
+        raise KeyError(f'Задача {name} не зарегистрирована.')
+    if settings.TASKS_EAGER:
+        _registry[name](*args, **kwargs)
+        return None
+    return Task.objects.create(
+        name=name, args=list(args), kwargs=kwargs,
+        max_attempts=settings.TASKS_MAX_ATTEMPTS
+    )
+
+
+def retry_delay(attempts):
+    """Пауза перед повтором: растёт вдвое после каждой неудачи."""
+    return timedelta(seconds=settings.TASKS_RETRY_DELAY * 2 ** (attempts - 1))
+
+
+def claim_due(limit):
+    """Помечает до ``limit`` созревших задач выполняемыми и отдаёт их id.
+
+    Задачу получает тот процесс, чей UPDATE первым сменил её состояние,
+    поэтому несколько воркеров могут работать с одной очередью.
+    """
+    now = timezone.now()
+    due = Task.objects.filter(
+        status=Task.PENDING, run_after__lte=now
+    ).values_list('pk', flat=True)[:limit]
+    return [
+        pk for pk in list(due)
+        if Task.objects.filter(pk=pk, status=Task.PENDING).update(
+            status=Task.RUNNING, updated_at=now
+        )
+    ]
+
+
+def requeue_stale(timeout):
+    """Возвращает в очередь задачи, брошенные остановленным воркером."""
+    return Task.objects.filter(
+        status=Task.RUNNING,
+        updated_at__lt=timezone.now() - timedelta(seconds=timeout)
+    ).update(status=Task.PENDING)
+
+
+def execute(task_id):
+    """Выполняет задачу; успешные удаляются, упавшие ждут повтора.
+
+    Если задачу удалили после выборки, она пропускается и возвращается None.
+    """
+    try:
+        try:
+            task = Task.objects.get(pk=task_id)
+        except Task.DoesNotExist:
+            logger.warning('Задача %s удалена до выполнения', task_id)
+            return None
+        task.attempts += 1
+        try:
+            _registry[task.name](*task.args, **task.kwargs)
+        except Exception:
+            logger.exception('Задача %s завершилась ошибкой', task)
+            task.last_error = traceback.format_exc()
+            if task.attempts >= task.max_attempts:
+                task.status = Task.FAILED
+            else:
+                task.status = Task.PENDING
+                task.run_after = timezone.now() + retry_delay(task.attempts)
+            task.save(update_fields=[
+                'attempts', 'last_error', 'status', 'run_after', 'updated_at'
+            ])
+            return False
+        task.delete()
+        return True
+    finally:
+        close_old_connections()
@@ -0,0 +1,108 @@
+import asyncio
+import importlib
+from http import HTTPStatus
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.test import AsyncClient
+from django.urls import clear_url_caches
+
+pytestmark = [pytest.mark.django_db(transaction=True)]
+
+
+def reload_urls():
+    import blog.urls
+    import blogicum.urls
+
+    importlib.reload(blog.urls)
+    importlib.reload(blogicum.urls)
+    clear_url_caches()
+
+
+@pytest.fixture
+def async_views(settings):
+    settings.ASYNC_VIEWS = True
+    reload_urls()
+    yield
+    settings.ASYNC_VIEWS = False
+    reload_urls()
+
+
+def async_get(url, **headers):
+    async def request():
+        return await AsyncClient().get(url, **headers)
+
+    return async_to_sync(request)()
+
+
+def test_async_read_views(async_views, client, post_with_published_location):
+    from django.urls import resolve
+
+    post = post_with_published_location
+    for url in ("/", f"/category/{post.category.slug}/",
+                f"/posts/{post.id}/"):
+        assert asyncio.iscoroutinefunction(resolve(url).func), (
+            f"Убедитесь, что при `ASYNC_VIEWS = True` страница `{url}`"
+            " обслуживается асинхронным представлением."
+        )
+        response = async_get(url)
+        assert response.status_code == HTTPStatus.OK
+        assert post.title in response.content.decode()
+        assert response.content == client.get(url).content
+
+        # AsyncClient в Django 3.2 передаёт именованные аргументы как
+        # заголовки без преобразования имён в формат HTTP_*.
+        not_modified = async_get(
+            url, **{"If-None-Match": response["ETag"]}
+        )
+        assert not_modified.status_code == HTTPStatus.NOT_MODIFIED
+
+    missing = async_get(f"/posts/{post.id + 1}/")
+    assert missing.status_code == HTTPStatus.NOT_FOUND
+
+
+def test_asgi_stack_serves_requests_concurrently(
+        async_views, settings, monkeypatch
+):
+    import time
+
+    from asgiref.testing import ApplicationCommunicator
+    from django.core.asgi import get_asgi_application
+    from django.http import HttpResponse
+
+    from blog.views import PostListView
+
+    delay, requests = 0.5, 6
+
+    def slow_get(self, request, *args, **kwargs):
+        time.sleep(delay)
+        return HttpResponse("ok")
+
+    monkeypatch.setattr(PostListView, "get", slow_get)
+    # Приложение загружает middleware из настоящего MIDDLEWARE.
+    application = get_asgi_application()
+
+    async def get(path):
+        communicator = ApplicationCommunicator(application, {
+            "type": "http", "asgi": {"version": "3.0"},
+            "http_version": "1.1", "method": "GET", "scheme": "http",
+            "path": path, "query_string": b"", "headers": [],
+            "server": ("testserver", 80), "client": ("127.0.0.1", 0),
+        })
+        await communicator.send_input({"type": "http.request", "body": b""})
+        start = await communicator.receive_output(timeout=10)
+        await communicator.receive_output(timeout=10)
+        return start["status"]
+
+    async def run():
+        return await asyncio.gather(*(get("/") for _ in range(requests)))
+
+    started = time.perf_counter()
+    statuses = async_to_sync(run)()
+    elapsed = time.perf_counter() - started
+    assert statuses == [HTTPStatus.OK] * requests
+    assert elapsed < delay * requests / 2, (
+        "Убедитесь, что под ASGI middleware проекта не выстраивают"
+        " асинхронные представления в очередь к одному потоку:"
+        f" {requests} запросов по {delay} с заняли {elapsed:.2f} с."
+    )
@@ -0,0 +1,118 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from mixer.backend.django import Mixer
+
+from conftest import N_PER_FIXTURE
+
+pytestmark = [pytest.mark.django_db]
+
+
+def get_stats(user):
+    from blog.models import AuthorStats
+
+    return AuthorStats.objects.filter(user=user).first()
+
+
+def test_author_stats_follow_posts_and_comments(
+        mixer: Mixer, user, published_category, CommentModel
+):
+    posts = mixer.cycle(N_PER_FIXTURE).blend(
+        "blog.Post", author=user, category=published_category
+    )
+    comment = mixer.blend(
+        f"blog.{CommentModel.__name__}", post=posts[0], author=user
+    )
+    stats = get_stats(user)
+    assert (stats.post_count, stats.comment_count) == (N_PER_FIXTURE, 1), (
+        "Убедитесь, что статистика автора обновляется при создании"
+        " публикаций и комментариев."
+    )
+    assert stats.last_activity == comment.created_at
+
+    comment.delete()
+    posts[-1].delete()
+    stats = get_stats(user)
+    assert (stats.post_count, stats.comment_count) == (N_PER_FIXTURE - 1, 0)
+
+
+def test_recount_author_stats_command(
+        mixer: Mixer, user, published_category
+):
+    from blog.models import AuthorStats
+
+    mixer.cycle(N_PER_FIXTURE).blend(
+        "blog.Post", author=user, category=published_category
+    )
+    AuthorStats.objects.filter(user=user).delete()
+
+    call_command("recount_author_stats", verbosity=0)
+    assert get_stats(user).post_count == N_PER_FIXTURE
+
+
+def test_profile_lists_only_author_posts(
+        mixer: Mixer, user, another_user, unlogged_client, published_category
+):
+    own = mixer.blend("blog.Post", author=user, category=published_category)
+    mixer.blend("blog.Post", author=another_user, category=published_category)
+
+    with CaptureQueriesContext(connection) as ctx:
+        response = unlogged_client.get(f"/profile/{user.username}/")
+    assert response.status_code == HTTPStatus.OK
+    assert [post.id for post in response.context["page_obj"]] == [own.id], (
+        "Убедитесь, что на странице пользователя показаны только его"
+        " публикации."
+    )
+    assert response.context["post_count"] == 1
+    selects = [
+        query["sql"] for query in ctx.captured_queries
+        if query["sql"].startswith("SELECT")
+    ]
+    assert sum('FROM "auth_user"' in sql for sql in selects) == 1, (
+        "Убедитесь, что страница пользователя загружает профиль из базы"
+        " данных один раз."
+    )
+    assert not any('FROM "blog_authorstats"' in sql for sql in selects)
+
+
+def test_profile_hides_unpublished_post_count(
+        mixer: Mixer, user, user_client, unlogged_client, published_category
+):
+    mixer.blend("blog.Post", author=user, category=published_category)
+    mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=False
+    )
+    url = f"/profile/{user.username}/"
+    assert unlogged_client.get(url).context["post_count"] == 1, (
+        "Убедитесь, что посетители чужого профиля видят число только"
+        " опубликованных публикаций."
+    )
+    assert user_client.get(url).context["post_count"] == 2
+
+
+def test_profile_shows_activity_only_to_owner(
+        mixer: Mixer, user, user_client, unlogged_client, published_category,
+        CommentModel
+):
+    hidden = mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=False
+    )
+    mixer.blend(f"blog.{CommentModel.__name__}", post=hidden, author=user)
+    url = f"/profile/{user.username}/"
+
+    response = unlogged_client.get(url)
+    assert response.context["stats"] is None
+    content = response.content.decode()
+    assert "Комментариев:" not in content, (
+        "Убедитесь, что посетители чужого профиля не видят статистику,"
+        " посчитанную по скрытым публикациям."
+    )
+    assert "Последняя активность:" not in content
+
+    owner_content = user_client.get(url).content.decode()
+    assert "Комментариев: 1" in owner_content
@@ -0,0 +1,49 @@
+import pytest
+from django.core.management import call_command
+from mixer.backend.django import Mixer
+
+from conftest import N_PER_FIXTURE
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_comment_count_follows_comments(
+        mixer: Mixer, post_with_published_location, CommentModel
+):
+    post = post_with_published_location
+    post.refresh_from_db()
+    assert post.comment_count == 0
+
+    comments = mixer.cycle(N_PER_FIXTURE).blend(
+        f"blog.{CommentModel.__name__}", post=post
+    )
+    post.refresh_from_db()
+    assert post.comment_count == N_PER_FIXTURE, (
+        "Убедитесь, что счётчик комментариев публикации увеличивается при"
+        " создании комментария."
+    )
+
+    comments[0].delete()
+    post.refresh_from_db()
+    assert post.comment_count == N_PER_FIXTURE - 1, (
+        "Убедитесь, что счётчик комментариев публикации уменьшается при"
+        " удалении комментария."
+    )
+
+
+def test_recount_comments_command(
+        mixer: Mixer, post_with_published_location, CommentModel, PostModel
+):
+    post = post_with_published_location
+    mixer.cycle(N_PER_FIXTURE).blend(
+        f"blog.{CommentModel.__name__}", post=post
+    )
+    PostModel.objects.filter(pk=post.pk).update(comment_count=42)
+
+    call_command("recount_comments")
+
+    post.refresh_from_db()
+    assert post.comment_count == N_PER_FIXTURE, (
+        "Убедитесь, что команда `recount_comments` восстанавливает"
+        " счётчики комментариев."
+    )
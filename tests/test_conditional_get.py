@@ -0,0 +1,125 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from mixer.backend.django import Mixer
+
+pytestmark = [pytest.mark.django_db]
+
+
+def revalidate(client, url, response):
+    return client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+
+
+def test_post_detail_not_modified(
+        mixer: Mixer, unlogged_client, post_with_published_location,
+        CommentModel
+):
+    url = f"/posts/{post_with_published_location.id}/"
+    response = unlogged_client.get(url)
+    assert response.status_code == HTTPStatus.OK
+    assert response.has_header("ETag") and response.has_header(
+        "Last-Modified"
+    ), (
+        "Убедитесь, что страница публикации отдаёт заголовки `ETag` и"
+        " `Last-Modified`."
+    )
+
+    with CaptureQueriesContext(connection) as ctx:
+        not_modified = revalidate(unlogged_client, url, response)
+    assert not_modified.status_code == HTTPStatus.NOT_MODIFIED, (
+        "Убедитесь, что при неизменившейся публикации страница отвечает"
+        " статусом 304."
+    )
+    assert len(ctx.captured_queries) == 1, (
+        "Убедитесь, что для ответа 304 выполняется один запрос к БД."
+    )
+    assert not not_modified.templates
+
+    by_date = unlogged_client.get(
+        url, HTTP_IF_MODIFIED_SINCE=response["Last-Modified"]
+    )
+    assert by_date.status_code == HTTPStatus.NOT_MODIFIED
+
+    mixer.blend(
+        f"blog.{CommentModel.__name__}", post=post_with_published_location
+    )
+    assert revalidate(unlogged_client, url, response).status_code == (
+        HTTPStatus.OK
+    ), (
+        "Убедитесь, что после добавления комментария страница публикации"
+        " отдаётся заново."
+    )
+
+
+def test_feed_not_modified_until_changed(
+        unlogged_client, post_with_published_location
+):
+    post = post_with_published_location
+    for url in ("/", f"/category/{post.category.slug}/"):
+        response = unlogged_client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        assert revalidate(unlogged_client, url, response).status_code == (
+            HTTPStatus.NOT_MODIFIED
+        ), f"Убедитесь, что страница `{url}` поддерживает условный GET."
+
+        post.category.title = f"{post.category.title} (изменено)"
+        post.category.save()
+        assert revalidate(unlogged_client, url, response).status_code == (
+            HTTPStatus.OK
+        ), (
+            f"Убедитесь, что после изменения категории страница `{url}`"
+            " отдаётся заново."
+        )
+
+
+def test_authenticated_validators_are_per_user(
+        user_client, unlogged_client, post_with_published_location
+):
+    url = f"/posts/{post_with_published_location.id}/"
+    anonymous = unlogged_client.get(url)
+    logged_in = user_client.get(url)
+    assert not logged_in.has_header("Last-Modified")
+    assert logged_in["ETag"] != anonymous["ETag"]
+    assert revalidate(user_client, url, anonymous).status_code == (
+        HTTPStatus.OK
+    )
+
+
+def test_authenticated_etag_changes_with_csrf_token(
+        user, client, post_with_published_location
+):
+    url = f"/posts/{post_with_published_location.id}/"
+    client.force_login(user)
+    response = client.get(url)
+    assert revalidate(client, url, response).status_code == (
+        HTTPStatus.NOT_MODIFIED
+    )
+
+    client.logout()
+    client.force_login(user)
+    client.get(url)
+    assert revalidate(client, url, response).status_code == HTTPStatus.OK, (
+        "Убедитесь, что после повторного входа страница с формой отдаётся"
+        " заново, а не из кэша браузера с устаревшим CSRF-токеном."
+    )
+
+
+def test_feed_modified_after_bulk_update(
+        unlogged_client, post_with_published_location, PostModel
+):
+    post = post_with_published_location
+    url = f"/category/{post.category.slug}/"
+    response = unlogged_client.get(url)
+    assert revalidate(unlogged_client, url, response).status_code == (
+        HTTPStatus.NOT_MODIFIED
+    )
+
+    PostModel.objects.filter(pk=post.pk).update(title="Изменено в админке")
+    changed = revalidate(unlogged_client, url, response)
+    assert changed.status_code == HTTPStatus.OK, (
+        "Убедитесь, что после массового изменения публикаций через"
+        " `update()` лента отдаётся заново."
+    )
+    assert "Изменено в админке" in changed.content.decode()
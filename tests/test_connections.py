@@ -0,0 +1,69 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connections
+
+from blog.connections import (
+    check_connections,
+    get_connection_stats,
+    reset_connection_stats,
+)
+
+pytestmark = [pytest.mark.django_db(transaction=True)]
+
+
+@pytest.fixture(autouse=True)
+def clean_stats():
+    reset_connection_stats()
+    yield
+    reset_connection_stats()
+
+
+def default_stats():
+    return get_connection_stats()["databases"].get("default", {})
+
+
+def test_open_connection_is_reused(settings):
+    settings.DB_HEALTH_CHECKS = True
+    connections["default"].ensure_connection()
+    check_connections()
+    assert default_stats()["reused"] == 1, (
+        "Убедитесь, что открытое соединение с БД используется повторно."
+    )
+
+
+def test_broken_connection_is_replaced(settings, monkeypatch):
+    settings.DB_HEALTH_CHECKS = True
+    connection = connections["default"]
+    connection.ensure_connection()
+    closed = []
+    monkeypatch.setattr(connection, "is_usable", lambda: False)
+    monkeypatch.setattr(connection, "close", lambda: closed.append(True))
+
+    check_connections()
+    assert closed and default_stats() == {
+        "opened": 0, "reused": 0, "errors": 1
+    }, (
+        "Убедитесь, что неработающее соединение закрывается до обработки"
+        " запроса."
+    )
+
+
+def test_new_connections_are_counted(tmp_path):
+    default = connections["default"]
+    connection = type(default)(
+        {**default.settings_dict, "NAME": str(tmp_path / "db.sqlite3")},
+        alias="metrics",
+    )
+    connection.ensure_connection()
+    connection.close()
+    assert get_connection_stats()["databases"]["metrics"]["opened"] == 1
+
+
+def test_db_stats_staff_only(user, user_client):
+    assert user_client.get("/stats/db/").status_code == HTTPStatus.FORBIDDEN
+    user.is_staff = True
+    user.save()
+    response = user_client.get("/stats/db/")
+    assert response.status_code == HTTPStatus.OK
+    assert set(response.json()) == {"pid", "databases"}
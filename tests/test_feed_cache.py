@@ -0,0 +1,165 @@
+from datetime import timedelta
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from mixer.backend.django import Mixer
+
+pytestmark = [pytest.mark.django_db]
+
+
+def get_content(client, url):
+    response = client.get(url)
+    assert response.status_code == HTTPStatus.OK
+    return response.content.decode("utf-8")
+
+
+def test_anonymous_feed_served_from_cache(
+        unlogged_client, post_with_published_location
+):
+    first = get_content(unlogged_client, "/")
+    with CaptureQueriesContext(connection) as ctx:
+        second = get_content(unlogged_client, "/")
+    assert first == second
+    assert not any(
+        '"blog_post"."title"' in query["sql"]
+        for query in ctx.captured_queries
+    ), (
+        "Убедитесь, что повторный запрос ленты анонимным пользователем"
+        " отдаётся из кэша без обращения к таблице публикаций."
+    )
+
+
+def test_feed_cache_invalidated_on_changes(
+        mixer: Mixer, user, unlogged_client, post_with_published_location,
+        CommentModel
+):
+    post = post_with_published_location
+    category_url = f"/category/{post.category.slug}/"
+    get_content(unlogged_client, "/")
+    get_content(unlogged_client, category_url)
+
+    post.title = "Обновлённый заголовок публикации"
+    post.save()
+    assert post.title in get_content(unlogged_client, "/")
+    assert post.title in get_content(unlogged_client, category_url)
+
+    mixer.blend(f"blog.{CommentModel.__name__}", post=post)
+    assert "Комментарии (1)" in get_content(unlogged_client, "/")
+
+    post.location.name = "Новое место публикации"
+    post.location.save()
+    assert post.location.name in get_content(unlogged_client, "/")
+
+    post.category.title = "Новое название категории"
+    post.category.save()
+    assert post.category.title in get_content(unlogged_client, "/")
+
+
+def test_feed_cache_expires_before_scheduled_post(
+        mixer: Mixer, user, published_category, settings
+):
+    from blog.cache import get_feed_timeout
+
+    mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        pub_date=timezone.now() + timedelta(seconds=30),
+    )
+    assert get_feed_timeout() <= 30 < settings.FEED_CACHE_TIMEOUT, (
+        "Убедитесь, что кэш страницы ленты истекает не позже времени"
+        " ближайшей отложенной публикации."
+    )
+
+
+def test_feed_cache_key_accepts_only_page_numbers(rf):
+    from django.urls import resolve
+
+    from blog.cache import feed_cache_key
+
+    def key(query):
+        request = rf.get("/", query)
+        request.resolver_match = resolve("/")
+        return feed_cache_key(request)
+
+    assert key({"page": "02"}) == key({"page": "2"}) != key({})
+    assert key({"page": "x" * 1000}) is None, (
+        "Убедитесь, что произвольное значение `page` не попадает в ключ кэша."
+    )
+    assert len(key({"cursor": "x" * 1000})) < 250
+
+
+def test_authenticated_feed_not_cached(
+        user_client, post_with_published_location
+):
+    get_content(user_client, "/")
+    with CaptureQueriesContext(connection) as ctx:
+        get_content(user_client, "/")
+    assert any("blog_post" in query["sql"] for query in ctx.captured_queries)
+
+
+def test_feed_cache_with_file_backend(
+        tmp_path, settings, unlogged_client, post_with_published_location
+):
+    settings.CACHES = {
+        **settings.CACHES,
+        "default": {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": str(tmp_path),
+        }
+    }
+    post = post_with_published_location
+    get_content(unlogged_client, "/")
+    post.title = "Заголовок после изменения"
+    post.save()
+    assert post.title in get_content(unlogged_client, "/")
+
+
+def test_post_cards_served_from_fragment_cache(
+        user, user_client, post_with_published_location
+):
+    from blog.cache import get_fragment_cache_stats, reset_fragment_cache_stats
+
+    reset_fragment_cache_stats()
+    get_content(user_client, "/")
+    get_content(user_client, "/")
+    stats = get_fragment_cache_stats()
+    assert (stats["misses"], stats["hits"]) == (1, 1), (
+        "Убедитесь, что карточка публикации рендерится один раз и при"
+        " повторном показе берётся из кэша фрагментов."
+    )
+
+    user.username = "renamed_author"
+    user.save()
+    assert "@renamed_author" in get_content(user_client, "/"), (
+        "Убедитесь, что кэш карточки публикации сбрасывается при смене"
+        " имени автора."
+    )
+
+
+def test_cache_stats_staff_only(user, user_client):
+    assert user_client.get("/stats/cache/").status_code == HTTPStatus.FORBIDDEN
+    user.is_staff = True
+    user.save()
+    response = user_client.get("/stats/cache/")
+    assert response.status_code == HTTPStatus.OK
+    assert set(response.json()["post_card"]) == {"hits", "misses", "hit_ratio"}
+
+
+def test_category_lookup_cached_until_changed(
+        user_client, post_with_published_location
+):
+    category = post_with_published_location.category
+    url = f"/category/{category.slug}/"
+    get_content(user_client, url)
+    with CaptureQueriesContext(connection) as ctx:
+        get_content(user_client, url)
+    assert not any(
+        query["sql"].startswith('SELECT "blog_category"."id"')
+        for query in ctx.captured_queries
+    ), "Убедитесь, что категория по slug берётся из кэша."
+
+    category.is_published = False
+    category.save()
+    assert user_client.get(url).status_code == HTTPStatus.NOT_FOUND
@@ -0,0 +1,78 @@
+import logging
+import re
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from blog.instrumentation import get_request_stats, reset_request_stats
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture(autouse=True)
+def clean_stats():
+    reset_request_stats()
+    yield
+    reset_request_stats()
+
+
+def test_server_timing_header(unlogged_client, post_with_published_location):
+    url = f"/posts/{post_with_published_location.id}/"
+    with CaptureQueriesContext(connection) as ctx:
+        response = unlogged_client.get(url)
+    timing = response["Server-Timing"]
+    assert re.fullmatch(
+        r'db;dur=[\d.]+;desc="(\d+) queries", tpl;dur=[\d.]+,'
+        r" total;dur=[\d.]+",
+        timing
+    ), "Убедитесь, что ответ содержит заголовок `Server-Timing`."
+    assert f'desc="{len(ctx.captured_queries)} queries"' in timing, (
+        "Убедитесь, что в `Server-Timing` учитываются все запросы к БД."
+    )
+
+    stats = get_request_stats()["views"]["blog:post_detail"]
+    assert stats["requests"] == 1
+    assert stats["queries"]["sum"] == len(ctx.captured_queries)
+    assert sum(stats["total_ms"]["histogram"]) == 1
+    assert stats["render_ms"]["sum"] > 0
+
+
+def test_query_budget_exceeded_is_logged(
+        settings, caplog, unlogged_client, post_with_published_location
+):
+    settings.QUERY_BUDGETS = {"blog:index": 1}
+    with caplog.at_level(logging.WARNING, logger="blog.instrumentation"):
+        unlogged_client.get("/")
+    assert any(
+        "blog:index" in record.getMessage() for record in caplog.records
+    ), (
+        "Убедитесь, что запрос, превысивший бюджет запросов к БД,"
+        " записывается в лог."
+    )
+    assert get_request_stats()["views"]["blog:index"]["over_budget"] == 1
+
+
+def test_views_stay_within_budgets(
+        settings, user_client, unlogged_client, post_with_published_location
+):
+    post = post_with_published_location
+    for client in (unlogged_client, user_client):
+        for url in ("/", f"/category/{post.category.slug}/",
+                    f"/posts/{post.id}/", f"/profile/{post.author.username}/"):
+            client.get(url)
+    for name, stats in get_request_stats()["views"].items():
+        assert stats["over_budget"] == 0, (
+            f"Представление `{name}` превысило бюджет запросов к БД."
+        )
+
+
+def test_request_stats_staff_only(user, user_client):
+    url = "/stats/requests/"
+    assert user_client.get(url).status_code == HTTPStatus.FORBIDDEN
+    user.is_staff = True
+    user.save()
+    response = user_client.get(url)
+    assert response.status_code == HTTPStatus.OK
+    assert set(response.json()) == {"pid", "buckets", "views"}
@@ -0,0 +1,107 @@
+from http import HTTPStatus
+
+import pytest
+
+pytestmark = [pytest.mark.django_db]
+
+CONTENT = bytes(range(256)) * 64
+URL = "/media/posts_images/photo.jpg"
+
+
+@pytest.fixture
+def media_file(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    (tmp_path / "posts_images").mkdir()
+    path = tmp_path / "posts_images/photo.jpg"
+    path.write_bytes(CONTENT)
+    return path
+
+
+def read(response):
+    return b"".join(response.streaming_content)
+
+
+def test_serves_media_with_cache_headers(client, media_file, settings):
+    response = client.get(URL)
+    assert response.status_code == HTTPStatus.OK, (
+        "Убедитесь, что загруженные файлы отдаются при `DEBUG = False`."
+    )
+    assert read(response) == CONTENT
+    assert response["Content-Type"] == "image/jpeg"
+    assert response["Content-Length"] == str(len(CONTENT))
+    assert response["Accept-Ranges"] == "bytes"
+    assert response["Cache-Control"] == (
+        f"public, max-age={settings.MEDIA_MAX_AGE}"
+    )
+
+    response = client.get(URL, HTTP_IF_NONE_MATCH=response["ETag"])
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
+
+
+@pytest.mark.parametrize("header, start, end", (
+    ("bytes=0-99", 0, 99),
+    ("bytes=100-", 100, len(CONTENT) - 1),
+    ("bytes=-10", len(CONTENT) - 10, len(CONTENT) - 1),
+    ("bytes=16000-99999", 16000, len(CONTENT) - 1),
+))
+def test_range_requests(client, media_file, header, start, end):
+    response = client.get(URL, HTTP_RANGE=header)
+    assert response.status_code == HTTPStatus.PARTIAL_CONTENT, (
+        "Убедитесь, что поддерживаются запросы с заголовком `Range`."
+    )
+    assert response["Content-Range"] == f"bytes {start}-{end}/{len(CONTENT)}"
+    assert response["Content-Length"] == str(end - start + 1)
+    assert read(response) == CONTENT[start:end + 1]
+
+
+def test_unsatisfiable_and_stale_ranges(client, media_file):
+    response = client.get(URL, HTTP_RANGE=f"bytes={len(CONTENT)}-")
+    assert response.status_code == HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE
+    assert response["Content-Range"] == f"bytes */{len(CONTENT)}"
+
+    response = client.get(
+        URL, HTTP_RANGE="bytes=0-9", HTTP_IF_RANGE='"outdated"'
+    )
+    assert response.status_code == HTTPStatus.OK
+    assert read(response) == CONTENT
+
+
+def test_rejects_paths_outside_media_root(client, media_file):
+    assert client.get("/media/../manage.py").status_code == (
+        HTTPStatus.NOT_FOUND
+    )
+    assert client.get("/media/posts_images/missing.jpg").status_code == (
+        HTTPStatus.NOT_FOUND
+    )
+
+
+@pytest.mark.parametrize("name", (
+    ".upload-k2j3h4",
+    ".hidden/photo.jpg",
+    "notes.txt",
+    "backup.sqlite3",
+))
+def test_hides_non_public_files(client, media_file, name):
+    path = media_file.parent / name
+    path.parent.mkdir(exist_ok=True)
+    path.write_bytes(CONTENT)
+    assert client.get(f"/media/posts_images/{name}").status_code == (
+        HTTPStatus.NOT_FOUND
+    ), (
+        "Убедитесь, что временные, скрытые и прочие не предназначенные"
+        " для публикации файлы из `MEDIA_ROOT` не отдаются."
+    )
+
+
+@pytest.mark.parametrize("mode, header, value", (
+    ("x-accel-redirect", "X-Accel-Redirect",
+     "/protected-media/posts_images/photo.jpg"),
+    ("x-sendfile", "X-Sendfile", None),
+))
+def test_front_proxy_modes(client, media_file, settings, mode, header, value):
+    settings.MEDIA_SERVING = mode
+    response = client.get(URL)
+    assert response.status_code == HTTPStatus.OK
+    assert response.content == b""
+    assert response[header] == (value or str(media_file))
+    assert response["Content-Type"] == "image/jpeg"
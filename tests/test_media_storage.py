@@ -0,0 +1,176 @@
+import os
+import time
+from io import BytesIO
+
+import pytest
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from PIL import Image
+
+from blog.models import MediaBlob, Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+def photo(color=(73, 109, 137), name="photo.jpg"):
+    buffer = BytesIO()
+    Image.new("RGB", (64, 48), color=color).save(buffer, format="JPEG")
+    return ContentFile(buffer.getvalue(), name=name)
+
+
+@pytest.fixture
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    return tmp_path
+
+
+@pytest.fixture
+def make_post(mixer, user, published_category, published_location):
+    def make(image=""):
+        return mixer.blend(
+            "blog.Post", author=user, category=published_category,
+            location=published_location, image=image
+        )
+    return make
+
+
+def make_old(root, *names):
+    old = time.time() - 2 * 60 * 60
+    for name in names or stored_files(root):
+        os.utime(root / name, (old, old))
+
+
+def stored_files(root):
+    return sorted(
+        os.path.relpath(os.path.join(directory, name), root)
+        for directory, _, names in os.walk(root)
+        for name in names
+    )
+
+
+def test_identical_uploads_are_stored_once(media_root, make_post):
+    first = make_post(photo(name="first.jpg"))
+    second = make_post(photo(name="second.JPG"))
+    assert first.image.name == second.image.name, (
+        "Убедитесь, что одинаковые фото сохраняются в один файл."
+    )
+    directory, filename = os.path.split(first.image.name)
+    assert directory == f"post_images/{filename[:2]}"
+    assert filename.endswith(".jpg")
+    assert stored_files(media_root) == [first.image.name]
+    assert MediaBlob.objects.get(name=first.image.name).ref_count == 2
+
+    other = make_post(photo(color=(0, 0, 0)))
+    assert other.image.name != first.image.name
+    assert len(stored_files(media_root)) == 2
+
+
+def test_last_reference_deletes_file_and_thumbnails(
+        media_root, make_post, django_capture_on_commit_callbacks
+):
+    first = make_post(photo())
+    second = make_post(photo())
+    name = first.image.name
+    variant = name.replace(".jpg", ".320w.webp")
+    (media_root / variant).write_bytes(b"webp")
+    make_old(media_root)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        first.delete()
+    assert MediaBlob.objects.get(name=name).ref_count == 1
+    assert (media_root / name).exists()
+
+    with django_capture_on_commit_callbacks(execute=True):
+        Post.objects.filter(pk=second.pk).delete()
+    assert not MediaBlob.objects.filter(name=name).exists()
+    assert stored_files(media_root) == [], (
+        "Убедитесь, что файл без ссылок удаляется вместе с копиями."
+    )
+
+
+def test_replaced_image_is_released(
+        media_root, make_post, django_capture_on_commit_callbacks
+):
+    post = make_post(photo())
+    old_name = post.image.name
+    make_old(media_root)
+    post = Post.objects.get(pk=post.pk)
+    with django_capture_on_commit_callbacks(execute=True):
+        post.image = photo(color=(255, 0, 0))
+        post.save()
+    assert not (media_root / old_name).exists()
+    assert stored_files(media_root) == [post.image.name]
+    assert MediaBlob.objects.get(name=post.image.name).ref_count == 1
+
+    make_old(media_root)
+    post = Post.objects.get(pk=post.pk)
+    with django_capture_on_commit_callbacks(execute=True):
+        post.image = ""
+        post.save()
+    assert stored_files(media_root) == []
+
+
+def test_fresh_blob_survives_last_release(
+        media_root, make_post, django_capture_on_commit_callbacks
+):
+    post = make_post(photo())
+    name = post.image.name
+    make_old(media_root)
+    # Та же фотография загружена снова, публикация ещё не сохранена.
+    storage = Post._meta.get_field("image").storage
+    storage.save("post_images/again.jpg", photo())
+    with django_capture_on_commit_callbacks(execute=True):
+        post.delete()
+    assert not MediaBlob.objects.filter(name=name).exists()
+    assert (media_root / name).exists(), (
+        "Убедитесь, что файл, только что загруженный повторно, не удаляется"
+        " вместе с последней ссылкой на него."
+    )
+
+    make_old(media_root)
+    call_command("media_gc", verbosity=0)
+    assert stored_files(media_root) == []
+
+
+def test_media_gc_removes_orphans(media_root, make_post):
+    post = make_post(photo())
+    live = post.image.name
+    orphan = make_post(photo(color=(0, 0, 0)))
+    orphan_name = orphan.image.name
+    Post.objects.filter(pk=orphan.pk).update(image="")
+    files = {
+        "live_variant": live.replace(".jpg", ".640w.jpg"),
+        "orphan_variant": orphan_name.replace(".jpg", ".640w.jpg"),
+        "legacy": "post_images/old.png",
+        "temp": "post_images/.upload-abc",
+    }
+    for name in files.values():
+        (media_root / name).write_bytes(b"x")
+    make_old(media_root)
+    fresh = "post_images/fresh.jpg"
+    (media_root / fresh).write_bytes(b"x")
+
+    call_command("media_gc", dry_run=True, verbosity=0)
+    assert len(stored_files(media_root)) == 7
+
+    call_command("media_gc", recount=True, verbosity=0)
+    assert stored_files(media_root) == sorted(
+        [live, files["live_variant"], fresh]
+    ), (
+        "Убедитесь, что `media_gc` удаляет файлы без ссылок и не трогает"
+        " используемые и недавно загруженные."
+    )
+    assert list(MediaBlob.objects.values_list("name", "ref_count")) == [
+        (live, 1)
+    ]
+
+
+def test_media_gc_walks_incrementally(media_root, make_post, capsys):
+    make_post(photo())
+    make_post(photo(color=(0, 0, 0)))
+    call_command("media_gc", max_dirs=2)
+    output = capsys.readouterr().out
+    assert "--start-after post_images/" in output
+    start_after = output.split("--start-after ")[1].split()[0]
+    call_command("media_gc", start_after=start_after)
+    assert "Проверено файлов: 1." in capsys.readouterr().out
@@ -0,0 +1,103 @@
+import base64
+import json
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+
+from conftest import N_PER_PAGE
+
+pytestmark = [
+    pytest.mark.django_db,
+    pytest.mark.usefixtures("many_posts_with_published_locations"),
+]
+
+
+def get_page(client, url):
+    response = client.get(url)
+    assert response.status_code == HTTPStatus.OK, (
+        f"Убедитесь, что страница `{url}` загружается без ошибок в режиме"
+        " курсорной пагинации."
+    )
+    return response.context["page_obj"]
+
+
+def feed_urls(user, published_category):
+    return (
+        "/",
+        f"/category/{published_category.slug}/",
+        f"/profile/{user.username}/",
+    )
+
+
+@override_settings(FEED_PAGINATION="cursor")
+def test_cursor_pagination_walks_feed(
+        user, user_client, published_category, PostModel
+):
+    expected_ids = list(
+        PostModel.objects.order_by("-pub_date", "-id")
+        .values_list("id", flat=True)
+    )
+    for url in feed_urls(user, published_category):
+        pages = [get_page(user_client, url)]
+        while pages[-1].has_next():
+            pages.append(get_page(
+                user_client, f"{url}?cursor={pages[-1].next_cursor}"
+            ))
+        walked_ids = [post.id for page in pages for post in page]
+        assert walked_ids == expected_ids, (
+            f"Убедитесь, что на странице `{url}` курсорная пагинация обходит"
+            " все публикации по порядку без пропусков и повторов."
+        )
+        assert all(len(page) <= N_PER_PAGE for page in pages)
+
+        previous = get_page(
+            user_client, f"{url}?cursor={pages[-1].previous_cursor}"
+        )
+        assert [post.id for post in previous] == [
+            post.id for post in pages[-2]
+        ], (
+            f"Убедитесь, что на странице `{url}` ссылка на предыдущую"
+            " страницу ведёт на предыдущую страницу ленты."
+        )
+
+
+@override_settings(FEED_PAGINATION="cursor")
+def test_cursor_pagination_skips_count(user_client):
+    with CaptureQueriesContext(connection) as ctx:
+        get_page(user_client, "/")
+    assert not any(
+        "COUNT(*)" in query["sql"] and "blog_post" in query["sql"]
+        for query in ctx.captured_queries
+    ), "Убедитесь, что курсорная пагинация не выполняет COUNT(*) по ленте."
+
+
+@override_settings(FEED_PAGINATION="cursor")
+def test_cursor_pagination_rejects_bad_cursor(user_client):
+    response = user_client.get("/?cursor=not-a-cursor")
+    assert response.status_code == HTTPStatus.NOT_FOUND
+
+
+@pytest.mark.parametrize(
+    "position",
+    (
+        {"d": "2020-01-01T00:00:00+00:00", "i": 10 ** 30},
+        {"d": "2020-01-01T00:00:00+00:00", "i": -(10 ** 30)},
+        {"d": "9999-12-31T23:59:59-14:00", "i": 1},
+        {"d": "0001-01-01T00:00:00+14:00", "i": 1},
+        {"d": "2020-01-01T00:00:00", "i": 1},
+    ),
+)
+@override_settings(FEED_PAGINATION="cursor")
+def test_cursor_pagination_rejects_out_of_range_cursor(
+        user_client, position
+):
+    raw = json.dumps(position).encode()
+    cursor = base64.urlsafe_b64encode(raw).decode().rstrip("=")
+    response = user_client.get(f"/?cursor={cursor}")
+    assert response.status_code == HTTPStatus.NOT_FOUND, (
+        "Убедитесь, что курсор со значениями вне допустимого диапазона"
+        " приводит к ответу 404, а не к ошибке сервера."
+    )
@@ -0,0 +1,156 @@
+"""Регрессионные тесты производительности страниц.
+
+Для каждого маршрута ``blog/urls.py`` и ``pages/urls.py`` страница
+загружается при одной публикации и одном комментарии и при
+``N_LARGE`` публикациях и комментариях: число запросов к БД не должно
+расти вместе с данными (N+1 в шаблонах вроде ``includes/comments.html``),
+укладываться в бюджет ``QUERY_BUDGETS`` и рендериться не дольше
+``MAX_RESPONSE_MS``. Запуск только этих тестов: ``pytest -m perf``.
+"""
+import time
+from datetime import timedelta
+from http import HTTPStatus
+
+import pytest
+from django.core.cache import caches
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from mixer.backend.django import Mixer
+
+from blog.instrumentation import query_budget
+from blog.urls import urlpatterns as blog_urlpatterns
+from pages.urls import urlpatterns as pages_urlpatterns
+from conftest import N_PER_PAGE
+
+pytestmark = [pytest.mark.django_db, pytest.mark.perf]
+
+N_LARGE = N_PER_PAGE * 2
+MAX_RESPONSE_MS = 1000
+SEARCH_WORD = "производительность"
+
+ROUTES = {
+    "blog:index": lambda s: "/",
+    "blog:search": lambda s: f"/search/?q={SEARCH_WORD}",
+    "blog:category_posts": lambda s: f"/category/{s.post.category.slug}/",
+    "blog:create_post": lambda s: "/posts/create/",
+    "blog:post_detail": lambda s: f"/posts/{s.post.id}/",
+    "blog:edit_post": lambda s: f"/posts/{s.post.id}/edit/",
+    "blog:delete_post": lambda s: f"/posts/{s.post.id}/delete/",
+    "blog:add_comment": lambda s: f"/posts/{s.post.id}/comment/",
+    "blog:edit_comment": (
+        lambda s: f"/posts/{s.post.id}/edit_comment/{s.comment.id}/"
+    ),
+    "blog:delete_comment": (
+        lambda s: f"/posts/{s.post.id}/delete_comment/{s.comment.id}/"
+    ),
+    "blog:profile": lambda s: f"/profile/{s.user.username}/",
+    "blog:edit_profile": lambda s: "/edit-profile/",
+    "blog:cache_stats": lambda s: "/stats/cache/",
+    "blog:db_stats": lambda s: "/stats/db/",
+    "blog:request_stats": lambda s: "/stats/requests/",
+    "pages:about": lambda s: "/pages/about/",
+    "pages:rules": lambda s: "/pages/rules/",
+}
+POST_DATA = {
+    "blog:add_comment": {"text": "Комментарий"},
+}
+
+
+class Scene:
+    """Публикация автора с комментарием и способ добавить ещё данных."""
+
+    def __init__(self, mixer, user, post, comment_model):
+        self.mixer = mixer
+        self.user = user
+        self.post = post
+        self.comment_model = f"blog.{comment_model.__name__}"
+        self.comment = mixer.blend(
+            self.comment_model, post=post, author=user
+        )
+
+    def grow(self, n):
+        """Добавляет ``n`` публикаций автора и ``n`` комментариев к посту.
+
+        Комментарии пишут разные пользователи, а публикации попадают в
+        разные местоположения, чтобы связанные объекты не совпадали.
+        """
+        locations = self.mixer.cycle(n).blend(
+            "blog.Location", is_published=True
+        )
+        self.mixer.cycle(n).blend(
+            "blog.Post",
+            author=self.user,
+            category=self.post.category,
+            location=self.mixer.sequence(*locations),
+            is_published=True,
+            pub_date=timezone.now() - timedelta(days=1),
+            title=self.mixer.sequence(lambda i: f"{SEARCH_WORD} {i}"),
+        )
+        self.mixer.cycle(n).blend(self.comment_model, post=self.post)
+
+
+@pytest.fixture
+def scene(mixer: Mixer, user, post_with_published_location, CommentModel):
+    user.is_staff = True
+    user.save()
+    post = post_with_published_location
+    post.pub_date = timezone.now() - timedelta(days=2)
+    post.title = SEARCH_WORD
+    post.save()
+    return Scene(mixer, user, post, CommentModel)
+
+
+def measure(client, name, scene):
+    url = ROUTES[name](scene)
+    method = client.post if name in POST_DATA else client.get
+    # Первый запрос прогревает кеши процесса (например, проверку наличия
+    # таблицы полнотекстового поиска), поэтому замеряется второй.
+    method(url, POST_DATA.get(name))
+    for cache in caches.all():
+        cache.clear()
+    with CaptureQueriesContext(connection) as ctx:
+        started = time.perf_counter()
+        response = method(url, POST_DATA.get(name))
+        elapsed_ms = (time.perf_counter() - started) * 1000
+    assert response.status_code in (HTTPStatus.OK, HTTPStatus.FOUND), (
+        f"Убедитесь, что страница `{url}` загружается без ошибок."
+    )
+    return len(ctx.captured_queries), elapsed_ms
+
+
+def route_names():
+    for namespace, urlpatterns in (
+            ("blog", blog_urlpatterns), ("pages", pages_urlpatterns)):
+        for pattern in urlpatterns:
+            if pattern.name:
+                yield f"{namespace}:{pattern.name}"
+
+
+def test_every_route_is_measured():
+    missing = set(route_names()) - set(ROUTES)
+    assert not missing, (
+        "Добавьте в `tests/test_performance.py` замер для маршрутов: "
+        + ", ".join(sorted(missing))
+    )
+
+
+@pytest.mark.parametrize("name", ROUTES)
+def test_query_count_does_not_grow_with_data(user_client, scene, name):
+    small_queries, _ = measure(user_client, name, scene)
+    scene.grow(N_LARGE)
+    large_queries, elapsed_ms = measure(user_client, name, scene)
+
+    assert large_queries == small_queries, (
+        f"Убедитесь, что число запросов к БД на странице `{name}` не зависит"
+        f" от количества публикаций и комментариев: {small_queries} при"
+        f" одной записи и {large_queries} при {N_LARGE}."
+    )
+    assert large_queries <= query_budget(name), (
+        f"Страница `{name}` выполняет {large_queries} запросов к БД при"
+        f" бюджете {query_budget(name)}."
+    )
+    assert elapsed_ms <= MAX_RESPONSE_MS, (
+        f"Страница `{name}` отвечает {elapsed_ms:.0f} мс при пороге"
+        f" {MAX_RESPONSE_MS} мс."
+    )
@@ -0,0 +1,108 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.cache import caches
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.test.client import Client
+from mixer.backend.django import Mixer
+
+from conftest import N_PER_PAGE
+
+pytestmark = [pytest.mark.django_db]
+
+
+def count_page_queries(client: Client, url: str) -> int:
+    for cache in caches.all():
+        cache.clear()
+    with CaptureQueriesContext(connection) as ctx:
+        response = client.get(url)
+    assert response.status_code == HTTPStatus.OK, (
+        f"Убедитесь, что страница `{url}` загружается без ошибок."
+    )
+    return len(ctx.captured_queries)
+
+
+@pytest.fixture
+def feed_urls(user, published_category):
+    return (
+        "/",
+        f"/category/{published_category.slug}/",
+        f"/profile/{user.username}/",
+    )
+
+
+def blend_feed_posts(mixer, user, published_category, locations, n):
+    return mixer.cycle(n).blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        location=mixer.sequence(*locations),
+    )
+
+
+def test_feed_queries_do_not_depend_on_page_size(
+        mixer: Mixer, user, unlogged_client, published_category,
+        published_locations, feed_urls
+):
+    blend_feed_posts(mixer, user, published_category, published_locations, 1)
+    single_post_counts = [
+        count_page_queries(unlogged_client, url) for url in feed_urls
+    ]
+
+    blend_feed_posts(
+        mixer, user, published_category, published_locations,
+        N_PER_PAGE * 2
+    )
+    full_page_counts = [
+        count_page_queries(unlogged_client, url) for url in feed_urls
+    ]
+
+    for url, single, full in zip(
+            feed_urls, single_post_counts, full_page_counts):
+        assert single == full, (
+            f"Убедитесь, что количество запросов к БД на странице `{url}` не"
+            " зависит от количества публикаций на странице: автор, категория"
+            " и местоположение должны загружаться одним запросом."
+        )
+
+
+def count_table_selects(ctx, table):
+    return sum(
+        query["sql"].startswith("SELECT") and f'FROM "{table}"' in query["sql"]
+        for query in ctx.captured_queries
+    )
+
+
+def test_author_views_fetch_object_once(
+        user_client, post_with_published_location,
+        mixer: Mixer, user, CommentModel
+):
+    post = post_with_published_location
+    comment = mixer.blend(
+        f"blog.{CommentModel.__name__}", post=post, author=user
+    )
+    urls = {
+        "blog_post": (
+            f"/posts/{post.id}/edit/",
+            f"/posts/{post.id}/delete/",
+        ),
+        "blog_comment": (
+            f"/posts/{post.id}/edit_comment/{comment.id}/",
+            f"/posts/{post.id}/delete_comment/{comment.id}/",
+        ),
+    }
+    for table, table_urls in urls.items():
+        for url in table_urls:
+            with CaptureQueriesContext(connection) as ctx:
+                response = user_client.get(url)
+            assert response.status_code == HTTPStatus.OK
+            assert count_table_selects(ctx, table) == 1, (
+                f"Убедитесь, что страница `{url}` загружает редактируемый"
+                " объект из базы данных только один раз."
+            )
+
+    url = f"/posts/{post.id}/delete_comment/{comment.id}/"
+    with CaptureQueriesContext(connection) as ctx:
+        user_client.post(url)
+    assert count_table_selects(ctx, "blog_comment") == 1
@@ -0,0 +1,81 @@
+import sqlite3
+
+import pytest
+from django.http import HttpResponse
+
+from blogicum.replicas import (
+    PIN_COOKIE,
+    PrimaryReplicaRouter,
+    ReplicaRoutingMiddleware,
+)
+
+router = PrimaryReplicaRouter()
+
+
+@pytest.fixture(autouse=True)
+def replicas(settings):
+    settings.DATABASE_REPLICAS = ["replica"]
+
+
+def route(request, view_name):
+    """Алиас базы, который роутер выбирает для чтения внутри view."""
+    from blog import views
+    from blog.models import Post
+
+    view = getattr(views, view_name).as_view()
+    routed = {}
+
+    def get_response(request):
+        middleware.process_view(request, view, (), {})
+        routed["alias"] = router.db_for_read(Post)
+        return HttpResponse()
+
+    middleware = ReplicaRoutingMiddleware(get_response)
+    middleware(request)
+    return routed["alias"]
+
+
+@pytest.mark.parametrize("view_name", (
+    "PostListView", "CategoryListView", "PostDetailView", "UserDetailView"
+))
+def test_read_views_use_replica(rf, view_name):
+    assert route(rf.get("/"), view_name) == "replica", (
+        f"Убедитесь, что `{view_name}` читает данные с реплики."
+    )
+    assert router.db_for_read(None) == "default"
+
+
+def test_writes_and_other_views_use_primary(rf):
+    assert route(rf.get("/"), "PostCreateView") == "default"
+    assert route(rf.post("/"), "PostListView") == "default"
+    assert router.db_for_write(None) == "default"
+    assert not router.allow_migrate("replica", "blog")
+
+
+def test_client_pinned_to_primary_after_write(rf):
+    middleware = ReplicaRoutingMiddleware(lambda request: HttpResponse())
+    response = middleware(rf.post("/posts/create/"))
+    assert PIN_COOKIE in response.cookies, (
+        "Убедитесь, что после изменяющего запроса клиент закрепляется за"
+        " основной базой."
+    )
+
+    pinned = rf.get("/")
+    pinned.COOKIES[PIN_COOKIE] = "1"
+    assert route(pinned, "PostListView") == "default"
+
+
+def test_replicate_db_copies_sqlite_file(tmp_path):
+    from blog.management.commands.replicate_db import copy_sqlite_database
+
+    source, target = tmp_path / "primary.sqlite3", tmp_path / "replica.sqlite3"
+    with sqlite3.connect(source) as connection:
+        connection.execute("CREATE TABLE post (title TEXT)")
+        connection.execute("INSERT INTO post VALUES ('Публикация')")
+    connection.close()
+
+    copy_sqlite_database(source, target)
+    with sqlite3.connect(target) as connection:
+        rows = connection.execute("SELECT title FROM post").fetchall()
+    connection.close()
+    assert rows == [("Публикация",)]
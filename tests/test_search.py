@@ -0,0 +1,155 @@
+from datetime import timedelta
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+from mixer.backend.django import Mixer
+
+pytestmark = [pytest.mark.django_db]
+
+
+def search(client, query):
+    response = client.get("/search/", {"q": query})
+    assert response.status_code == HTTPStatus.OK, (
+        "Убедитесь, что страница поиска `/search/` загружается без ошибок."
+    )
+    return [post.id for post in response.context["page_obj"]]
+
+
+@pytest.fixture
+def searchable_posts(mixer: Mixer, user, published_category):
+    # Одна дата у всех публикаций: порядок определяется только релевантностью.
+    pub_date = timezone.now() - timedelta(days=1)
+    return {
+        name: mixer.blend(
+            "blog.Post", author=user, category=published_category,
+            pub_date=pub_date, **fields
+        )
+        for name, fields in {
+            "in_title": {"title": "Путешествие на Байкал", "text": "Зима."},
+            "in_text": {"title": "Заметки", "text": "Лёд Байкала прозрачен."},
+            "unpublished": {
+                "title": "Байкал летом", "text": "Черновик.",
+                "is_published": False,
+            },
+            "other": {"title": "Горы Алтая", "text": "Снег и перевалы."},
+        }.items()
+    }
+
+
+def test_search_finds_published_posts(unlogged_client, searchable_posts):
+    found = search(unlogged_client, "байкал")
+    assert found == [
+        searchable_posts["in_title"].id, searchable_posts["in_text"].id
+    ], (
+        "Убедитесь, что поиск находит только опубликованные публикации и"
+        " ставит совпадение в заголовке выше совпадения в тексте."
+    )
+
+
+def test_search_index_follows_post_changes(unlogged_client, searchable_posts):
+    post = searchable_posts["other"]
+    post.title = "Байкальский хребет"
+    post.save()
+    assert post.id in search(unlogged_client, "байкальский")
+
+    post.delete()
+    assert search(unlogged_client, "байкальский") == []
+
+
+def test_search_ignores_query_syntax(unlogged_client, searchable_posts):
+    for query in ('"', "NEAR(", "title:*", "AND OR NOT", ""):
+        search(unlogged_client, query)
+
+
+def test_rebuild_search_index(unlogged_client, searchable_posts):
+    from django.db import connection
+
+    with connection.cursor() as cursor:
+        cursor.execute("DELETE FROM blog_post_fts")
+    assert search(unlogged_client, "алтая") == []
+
+    call_command("rebuild_search_index", verbosity=0)
+    assert search(unlogged_client, "алтая") == [
+        searchable_posts["other"].id
+    ]
+
+
+def test_admin_search_uses_index(admin_client, searchable_posts):
+    response = admin_client.get("/admin/blog/post/", {"q": "байкал"})
+    assert response.status_code == HTTPStatus.OK
+    found = {post.id for post in response.context["cl"].result_list}
+    assert found == {
+        searchable_posts[name].id
+        for name in ("in_title", "in_text", "unpublished")
+    }
+
+
+def test_admin_search_is_not_capped(admin_client, searchable_posts, settings):
+    settings.SEARCH_MAX_RESULTS = 1
+    response = admin_client.get("/admin/blog/post/", {"q": "байкал"})
+    assert len(response.context["cl"].result_list) == 3, (
+        "Убедитесь, что поиск в админке не ограничен `SEARCH_MAX_RESULTS`."
+    )
+
+
+def test_future_posts_ranked_by_relevance(mixer: Mixer, user,
+                                          published_category):
+    from blog.search import ranked_post_ids
+
+    far_future = timezone.now() + timedelta(days=3650)
+    in_title, in_text = (
+        mixer.blend(
+            "blog.Post", author=user, category=published_category,
+            pub_date=far_future, **fields
+        )
+        for fields in (
+            {"title": "Путешествие на Байкал", "text": "Зима."},
+            {"title": "Заметки", "text": "Лёд Байкала прозрачен."},
+        )
+    )
+    assert ranked_post_ids("байкал", published_only=False) == [
+        in_title.id, in_text.id
+    ]
+
+
+def test_broken_index_falls_back_to_icontains(
+        unlogged_client, searchable_posts, caplog
+):
+    from django.db import connection
+
+    with connection.cursor() as cursor:
+        cursor.execute("DROP TABLE blog_post_fts")
+    # LIKE в SQLite не различает регистр только для латиницы.
+    assert set(search(unlogged_client, "Байкал")) == {
+        searchable_posts["in_title"].id, searchable_posts["in_text"].id
+    }
+    assert "blog_post_fts" in caplog.text, (
+        "Убедитесь, что ошибка полнотекстового индекса попадает в лог."
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+def test_search_reads_from_replica(unlogged_client, searchable_posts,
+                                   settings):
+    from django.db import connections
+    from django.test.utils import CaptureQueriesContext
+
+    default = connections["default"]
+    replica = type(default)({**default.settings_dict}, alias="replica")
+    connections["replica"] = replica
+    settings.DATABASE_REPLICAS = ["replica"]
+    try:
+        with CaptureQueriesContext(replica) as ctx:
+            found = search(unlogged_client, "байкал")
+    finally:
+        del connections["replica"]
+        replica.close()
+    assert found == [
+        searchable_posts["in_title"].id, searchable_posts["in_text"].id
+    ]
+    assert any("MATCH" in query["sql"] for query in ctx.captured_queries), (
+        "Убедитесь, что полнотекстовый поиск выполняется на реплике, которую"
+        " выбрал роутер базы данных."
+    )
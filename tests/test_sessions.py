@@ -0,0 +1,106 @@
+from http import HTTPStatus
+
+import pytest
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from blogicum.sessions import ANONYMOUS_COOKIE
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture(autouse=True)
+def cached_sessions(settings):
+    # Без общего кэша settings.py оставляет сессии в БД; в одном процессе
+    # тестов локального кэша достаточно.
+    settings.SESSION_ENGINE = "django.contrib.sessions.backends.cached_db"
+
+
+def session_queries(client, url):
+    with CaptureQueriesContext(connection) as ctx:
+        response = client.get(url)
+    assert response.status_code == HTTPStatus.OK
+    return response, [
+        query["sql"] for query in ctx.captured_queries
+        if "django_session" in query["sql"]
+    ]
+
+
+@pytest.fixture
+def anonymous_session_client(client):
+    session = client.session
+    session["seen_rules"] = True
+    session.save()
+    client.cookies[settings.SESSION_COOKIE_NAME] = session.session_key
+    return client
+
+
+def test_logged_in_session_is_read_from_cache(user_client):
+    _, queries = session_queries(user_client, "/")
+    assert not queries, (
+        "Убедитесь, что сессия авторизованного пользователя читается из"
+        " кэша, без запроса к таблице `django_session`."
+    )
+
+    caches[settings.SESSION_CACHE_ALIAS].clear()
+    _, queries = session_queries(user_client, "/")
+    assert len(queries) == 1
+    _, queries = session_queries(user_client, "/")
+    assert not queries
+
+
+def test_anonymous_feed_skips_session_storage(
+        anonymous_session_client, user, post_with_published_location
+):
+    client = anonymous_session_client
+    response, _ = session_queries(client, "/")
+    assert ANONYMOUS_COOKIE in response.cookies, (
+        "Убедитесь, что аноним с непустой сессией получает cookie"
+        f" `{ANONYMOUS_COOKIE}`."
+    )
+
+    caches[settings.SESSION_CACHE_ALIAS].clear()
+    category = post_with_published_location.category
+    for url in ("/", f"/category/{category.slug}/"):
+        response, queries = session_queries(client, url)
+        assert not queries, (
+            f"Убедитесь, что страница `{url}` не обращается к хранилищу"
+            " сессий для анонима."
+        )
+        assert settings.SESSION_COOKIE_NAME not in response.cookies
+        assert "Cookie" in response["Vary"]
+
+    _, queries = session_queries(client, f"/profile/{user.username}/")
+    assert len(queries) == 1
+    assert client.session["seen_rules"]
+
+
+def test_login_drops_anonymous_marker(anonymous_session_client, user):
+    client = anonymous_session_client
+    client.get("/")
+    user.set_password("password")
+    user.save()
+    response = client.post(
+        "/auth/login/", {"username": user.username, "password": "password"}
+    )
+    assert response.status_code == HTTPStatus.FOUND
+    assert response.cookies[ANONYMOUS_COOKIE]["max-age"] == 0, (
+        f"Убедитесь, что cookie `{ANONYMOUS_COOKIE}` удаляется после входа."
+    )
+    response = client.get("/")
+    assert response.context["user"] == user
+
+
+def test_sessions_not_cached_per_process_by_default():
+    from blogicum import settings as project_settings
+
+    cache = project_settings.CACHES[project_settings.SESSION_CACHE_ALIAS]
+    assert not (
+        project_settings.SESSION_ENGINE.endswith("cache")
+        or project_settings.SESSION_ENGINE.endswith("cached_db")
+    ) or "locmem" not in cache["BACKEND"], (
+        "Убедитесь, что сессии не кэшируются в локальной памяти процесса:"
+        " выход на одном воркере не сбросил бы сессию на остальных."
+    )
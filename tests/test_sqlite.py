@@ -0,0 +1,60 @@
+import pytest
+from django.db import OperationalError, connections, transaction
+
+pytestmark = [pytest.mark.django_db]
+
+
+def pragma(conn, name):
+    with conn.cursor() as cursor:
+        cursor.execute(f"PRAGMA {name}")
+        return cursor.fetchone()[0]
+
+
+def connect(tmp_path, alias, **options):
+    default = connections["default"]
+    return type(default)(
+        {**default.settings_dict, "NAME": str(tmp_path / "db.sqlite3"),
+         "OPTIONS": options},
+        alias=alias,
+    )
+
+
+@pytest.fixture
+def file_connection(tmp_path):
+    conn = connect(tmp_path, "pragmas")
+    yield conn
+    conn.close()
+
+
+def test_pragmas_applied_on_connect(settings, file_connection):
+    assert pragma(file_connection, "journal_mode") == "wal", (
+        "Убедитесь, что для новых соединений с SQLite включается режим WAL."
+    )
+    expected = settings.SQLITE_PRAGMAS
+    assert pragma(file_connection, "cache_size") == expected["cache_size"]
+    assert pragma(file_connection, "mmap_size") == expected["mmap_size"]
+    # 1 — NORMAL.
+    assert pragma(file_connection, "synchronous") == 1
+
+
+def test_pragmas_follow_settings(settings, file_connection):
+    settings.SQLITE_PRAGMAS = {"busy_timeout": 1234}
+    assert pragma(file_connection, "busy_timeout") == 1234
+    assert pragma(file_connection, "journal_mode") == "delete"
+
+
+def test_atomic_takes_write_lock_at_start(tmp_path, file_connection):
+    other = connect(tmp_path, "other", timeout=0.1)
+    with file_connection.cursor() as cursor:
+        cursor.execute("CREATE TABLE t (id integer)")
+    connections["pragmas"] = file_connection
+    try:
+        with transaction.atomic(using="pragmas"):
+            with pytest.raises(OperationalError, match="locked"):
+                with other.cursor() as cursor:
+                    cursor.execute("INSERT INTO t VALUES (1)")
+            with file_connection.cursor() as cursor:
+                cursor.execute("INSERT INTO t VALUES (2)")
+    finally:
+        del connections["pragmas"]
+        other.close()
@@ -0,0 +1,101 @@
+import gzip
+from http import HTTPStatus
+
+import pytest
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.management import call_command
+from django.test import Client
+
+pytestmark = [pytest.mark.django_db]
+
+CSS = "css/bootstrap.min.css"
+
+
+@pytest.fixture
+def collected(settings, tmp_path):
+    settings.STATIC_ROOT = tmp_path
+    call_command("collectstatic", interactive=False, verbosity=0)
+    return tmp_path
+
+
+def test_collectstatic_hashes_and_compresses(collected):
+    hashed = staticfiles_storage.stored_name(CSS)
+    assert hashed != CSS and hashed.startswith("css/bootstrap.min."), (
+        "Убедитесь, что `collectstatic` добавляет хеш содержимого к имени"
+        " файла статики."
+    )
+    original = (collected / hashed).read_bytes()
+    assert gzip.decompress((collected / f"{hashed}.gz").read_bytes()) == (
+        original
+    )
+    assert not (collected / "img/logo.png.gz").exists(), (
+        "Убедитесь, что уже сжатые форматы (PNG) не сжимаются повторно."
+    )
+
+
+def test_page_links_hashed_static(collected, client):
+    content = client.get("/").content.decode()
+    assert staticfiles_storage.url("img/logo.png") in content
+    assert "/static/img/logo.png" not in content
+
+
+def test_serves_precompressed_with_immutable_cache(collected):
+    client = Client()
+    url = staticfiles_storage.url(CSS)
+    response = client.get(url, HTTP_ACCEPT_ENCODING="gzip, deflate")
+    assert response.status_code == HTTPStatus.OK
+    assert response["Content-Encoding"] == "gzip"
+    assert response["Content-Type"] == "text/css"
+    assert "Accept-Encoding" in response["Vary"]
+    assert response["Cache-Control"] == (
+        "public, max-age=31536000, immutable"
+    ), "Убедитесь, что файлы с хешем в имени кешируются навсегда."
+    body = b"".join(response.streaming_content)
+    assert gzip.decompress(body) == (
+        collected / staticfiles_storage.stored_name(CSS)
+    ).read_bytes()
+
+    response = client.get(url)
+    assert "Content-Encoding" not in response
+    assert int(response["Content-Length"]) == (
+        collected / staticfiles_storage.stored_name(CSS)
+    ).stat().st_size
+
+    response = client.get(url, HTTP_IF_MODIFIED_SINCE=response["Last-Modified"])
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
+
+
+def test_unhashed_names_get_short_cache(collected, settings):
+    response = Client().get(f"/static/{CSS}")
+    assert response.status_code == HTTPStatus.OK
+    assert response["Cache-Control"] == (
+        f"public, max-age={settings.STATIC_MAX_AGE}"
+    )
+
+
+def test_bootstrap_served_from_own_static(client):
+    content = client.get("/").content.decode()
+    assert f'<link rel="stylesheet" href="/static/{CSS}">' in content, (
+        "Убедитесь, что Bootstrap подключается из статики проекта."
+    )
+    assert "cdn.jsdelivr.net" not in content
+
+
+def test_bootstrap_link_uses_hashed_name(collected, client):
+    content = client.get("/").content.decode()
+    assert (
+        f'<link rel="stylesheet" href="{staticfiles_storage.url(CSS)}">'
+    ) in content
+
+
+def test_critical_css_is_inlined(settings, tmp_path, client):
+    (tmp_path / "css").mkdir()
+    (tmp_path / "css/critical.css").write_text("body{margin:0}")
+    settings.STATICFILES_DIRS = [*settings.STATICFILES_DIRS, tmp_path]
+    settings.CRITICAL_CSS = {CSS: "css/critical.css"}
+    content = client.get("/").content.decode()
+    assert "<style>body{margin:0}</style>" in content
+    assert f'<link rel="preload" href="/static/{CSS}" as="style"' in content
+    assert f'<noscript><link rel="stylesheet" href="/static/{CSS}">' in (
+        content
+    )
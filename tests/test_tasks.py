@@ -0,0 +1,168 @@
+from datetime import timedelta
+
+import pytest
+from django.core import mail
+from django.core.management import call_command
+from django.utils import timezone
+
+from tasks.models import Task
+from tasks.queue import claim_due, execute, task
+
+pytestmark = [pytest.mark.django_db]
+
+calls = []
+
+
+@task
+def record(value):
+    calls.append(value)
+
+
+@task
+def fail_once(value):
+    if value not in calls:
+        calls.append(value)
+        raise RuntimeError("первая попытка")
+
+
+@pytest.fixture
+def queued(settings):
+    settings.TASKS_EAGER = False
+    settings.TASKS_MAX_ATTEMPTS = 2
+    calls.clear()
+    yield
+    calls.clear()
+
+
+def test_eager_mode_runs_inline(settings):
+    calls.clear()
+    assert record.delay("сразу") is None
+    assert calls == ["сразу"]
+    assert not Task.objects.exists()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_worker_runs_queued_tasks(queued):
+    record.delay("из очереди")
+    assert calls == []
+
+    call_command("run_worker", "--once", "--workers", "2", verbosity=0)
+    assert calls == ["из очереди"], (
+        "Убедитесь, что команда `run_worker` выполняет задачи из очереди."
+    )
+    assert not Task.objects.exists()
+
+
+def test_failed_task_is_retried(queued):
+    queued_task = fail_once.delay("повтор")
+    (task_id,) = claim_due(10)
+    assert execute(task_id) is False
+
+    queued_task.refresh_from_db()
+    assert queued_task.status == Task.PENDING
+    assert queued_task.run_after > timezone.now()
+    assert "первая попытка" in queued_task.last_error
+    assert claim_due(10) == [], "Повтор не должен начинаться до паузы."
+
+    Task.objects.update(run_after=timezone.now() - timedelta(seconds=1))
+    (task_id,) = claim_due(10)
+    assert execute(task_id) is True
+    assert not Task.objects.exists()
+
+
+def test_deleted_task_is_skipped(queued):
+    record.delay("удалена")
+    (task_id,) = claim_due(10)
+    Task.objects.filter(pk=task_id).delete()
+    assert execute(task_id) is None
+    assert calls == []
+
+
+@pytest.mark.django_db(transaction=True)
+def test_worker_survives_deleted_task(queued, monkeypatch):
+    deleted = record.delay("удалена")
+    record.delay("осталась")
+
+    def claim_and_delete(limit):
+        task_ids = claim_due(limit)
+        Task.objects.filter(pk=deleted.pk).delete()
+        return task_ids
+
+    monkeypatch.setattr(
+        "tasks.management.commands.run_worker.claim_due",
+        claim_and_delete
+    )
+    call_command("run_worker", "--once", "--workers", "1", verbosity=0)
+    assert calls == ["осталась"], (
+        "Убедитесь, что удалённая до выполнения задача пропускается"
+        " и не останавливает воркер."
+    )
+
+
+def test_task_fails_after_max_attempts(queued):
+    queued_task = Task.objects.create(
+        name="tests.unknown", max_attempts=1
+    )
+    (task_id,) = claim_due(10)
+    assert execute(task_id) is False
+    queued_task.refresh_from_db()
+    assert queued_task.status == Task.FAILED
+
+
+@pytest.mark.django_db(transaction=True)
+def test_comment_side_effects_are_queued(
+        queued, user, user_client, post_with_published_location
+):
+    from blog.models import AuthorStats
+
+    post = post_with_published_location
+    AuthorStats.objects.filter(user=user).delete()
+    user_client.post(f"/posts/{post.id}/comment/", {"text": "Комментарий"})
+    assert Task.objects.filter(name="blog.tasks.update_author_stats").exists()
+    assert not AuthorStats.objects.filter(user=user).exists()
+
+    # Тестовая БД SQLite в памяти с общим кэшем не ждёт блокировок таблиц,
+    # поэтому задачи выполняются в одном потоке.
+    call_command("run_worker", "--once", "--workers", "1", verbosity=0)
+    assert AuthorStats.objects.get(user=user).comment_count == 1
+
+
+def test_author_stats_tasks_are_idempotent(
+        queued, user, another_user, post_with_published_location
+):
+    from blog.models import AuthorStats, Comment
+    from blog.tasks import update_author_stats
+
+    post = post_with_published_location
+    AuthorStats.objects.filter(user=another_user).delete()
+    first = Comment.objects.create(post=post, author=another_user, text="1")
+    Comment.objects.create(post=post, author=another_user, text="2")
+    first.delete()
+    # Задачи выполняются с опозданием, повторно и не по порядку.
+    update_author_stats(another_user.pk, create=False)
+    for _ in range(3):
+        update_author_stats(another_user.pk)
+    stats = AuthorStats.objects.get(user=another_user)
+    assert stats.comment_count == 1, (
+        "Убедитесь, что повторное выполнение задачи не искажает статистику."
+    )
+    assert stats.last_activity is not None
+
+
+def test_user_deletion_does_not_recreate_stats(user, mixer):
+    from blog.models import AuthorStats
+
+    mixer.blend("blog.Post", author=user)
+    user.delete()
+    assert not AuthorStats.objects.exists()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_password_reset_email_is_queued(queued, user, client):
+    user.email = "user@example.com"
+    user.save()
+    client.post("/auth/password_reset/", {"email": user.email})
+    assert mail.outbox == []
+
+    call_command("run_worker", "--once", verbosity=0)
+    assert [message.to for message in mail.outbox] == [[user.email]]
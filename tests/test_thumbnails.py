@@ -0,0 +1,107 @@
+from io import BytesIO
+
+import pytest
+from bs4 import BeautifulSoup
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.utils import timezone
+from PIL import Image
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def thumbnail_settings(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    settings.THUMBNAIL_WIDTHS = (320, 640)
+    return settings
+
+
+def make_upload(width=800, height=600, name="photo.png"):
+    buffer = BytesIO()
+    Image.new("RGBA", (width, height), (73, 109, 137, 255)).save(
+        buffer, "PNG"
+    )
+    return SimpleUploadedFile(name, buffer.getvalue(), "image/png")
+
+
+def create_post(client, published_category, image):
+    return client.post("/posts/create/", {
+        "title": "Фото",
+        "text": "Текст",
+        "pub_date": timezone.now().strftime("%Y-%m-%dT%H:%M"),
+        "category": published_category.id,
+        "is_published": True,
+        "image": image,
+    })
+
+
+def test_thumbnails_created_after_save(
+        thumbnail_settings, user, user_client, published_category,
+        unlogged_client
+):
+    from blog.models import Post
+
+    create_post(user_client, published_category, make_upload())
+    post = Post.objects.get(author=user)
+    assert post.image_widths == [320, 640], (
+        "Убедитесь, что после сохранения публикации создаются уменьшенные"
+        " копии фото."
+    )
+    root = post.image.name.rsplit(".", 1)[0]
+    for width in (320, 640):
+        for ext in ("webp", "jpg"):
+            with Image.open(thumbnail_settings.MEDIA_ROOT
+                            / f"{root}.{width}w.{ext}") as variant:
+                assert variant.width == width
+
+    soup = BeautifulSoup(unlogged_client.get("/").content, "html.parser")
+    source = soup.select_one("picture source[type='image/webp']")
+    assert source and f"{root}.320w.webp 320w" in source["srcset"], (
+        "Убедитесь, что карточка публикации выводит `srcset` с копиями фото."
+    )
+    assert f"{root}.640w.jpg 640w" in soup.select_one("picture img")["srcset"]
+
+
+def test_small_image_is_not_upscaled(thumbnail_settings, user_client,
+                                     user, published_category):
+    from blog.models import Post
+
+    create_post(user_client, published_category, make_upload(400, 300))
+    assert Post.objects.get(author=user).image_widths == [320, 400]
+
+
+def test_make_thumbnails_command(thumbnail_settings, user, user_client,
+                                 published_category):
+    from blog.models import Post
+
+    thumbnail_settings.TASKS_EAGER = False
+    create_post(user_client, published_category, make_upload())
+    post = Post.objects.get(author=user)
+    assert post.image_widths == []
+
+    call_command("make_thumbnails", verbosity=0)
+    post.refresh_from_db()
+    assert post.image_widths == [320, 640]
+
+
+def test_thumbnails_use_post_image_storage(
+        thumbnail_settings, user, user_client, published_category,
+        monkeypatch, tmp_path
+):
+    from blog.models import Post
+    from blog.storage import ContentAddressedStorage
+
+    photos = tmp_path / "photos"
+    monkeypatch.setattr(
+        Post._meta.get_field("image"), "storage",
+        ContentAddressedStorage(location=photos)
+    )
+    create_post(user_client, published_category, make_upload())
+    post = Post.objects.get(author=user)
+    assert post.image_widths == [320, 640]
+    root = post.image.name.rsplit(".", 1)[0]
+    assert (photos / f"{root}.320w.webp").exists(), (
+        "Убедитесь, что копии фото сохраняются в хранилище поля `image`."
+    )
+    assert not (thumbnail_settings.MEDIA_ROOT / f"{root}.320w.webp").exists()
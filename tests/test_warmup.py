@@ -0,0 +1,34 @@
+from django.core.management import call_command
+from django.template import engines
+
+
+def test_warm_templates_fills_cached_loader():
+    engine = engines["django"].engine
+    cached_loader = engine.template_loaders[0]
+    assert hasattr(cached_loader, "get_template_cache"), (
+        "Убедитесь, что в настройках `TEMPLATES` включён кэширующий"
+        " загрузчик шаблонов `django.template.loaders.cached.Loader`."
+    )
+    cached_loader.reset()
+
+    call_command("warm_templates", verbosity=0)
+
+    for name in ("base.html", "includes/header.html", "blog/index.html"):
+        assert name in cached_loader.get_template_cache, (
+            "Убедитесь, что команда `warm_templates` компилирует шаблоны"
+            f" проекта, в том числе `{name}`."
+        )
+
+
+def test_startup_warmup_follows_setting(settings):
+    from blog.warmup import warm_templates_on_startup
+
+    cached_loader = engines["django"].engine.template_loaders[0]
+    cached_loader.reset()
+    settings.WARM_TEMPLATES_ON_STARTUP = False
+    warm_templates_on_startup()
+    assert "base.html" not in cached_loader.get_template_cache
+
+    settings.WARM_TEMPLATES_ON_STARTUP = True
+    warm_templates_on_startup()
+    assert "base.html" in cached_loader.get_template_cache